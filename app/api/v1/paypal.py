@@ -1,121 +1,167 @@
 """PayPal API routes - balance and transactions endpoints."""
 
 import logging
-import re
-from decimal import Decimal
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Set
 
 import httpx
-from fastapi import APIRouter, HTTPException, Query, Request, status
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
 
 from app.services.exchange_rate_service import exchange_rate_service
-from app.services.paypal_client import paypal_client
+from app.services.paypal_client import InvalidDateRangeError, get_paypal_client
 from app.services.rate_limiter import limiter
+from app.services.response_cache import make_cache_key, response_cache
+from app.utils.case import to_snake_case
 
 router = APIRouter(prefix="/api/v1/paypal", tags=["paypal"])
 logger = logging.getLogger(__name__)
 
+# Replacement for the last 5 characters of masked transaction IDs
+TRANSACTION_ID_MASK = "*****"
 
-def to_snake_case(data: Union[Dict[str, Any], List[Any]]) -> Union[Dict[str, Any], List[Any]]:
+
+def _mask_id(container: Dict[str, Any]) -> None:
+    """Replace the last 5 characters of container["transaction_id"] with asterisks."""
+    tx_id = container.get("transaction_id")
+    if tx_id and len(tx_id) > 5:
+        container["transaction_id"] = tx_id[:-5] + TRANSACTION_ID_MASK
+
+
+def _to_usd(value: Any, currency_code: str, rates: Dict[str, float]) -> float:
     """
-    Convert camelCase keys to snake_case recursively.
+    Convert an amount to USD using a preloaded rate map, rounded to cents.
 
-    PayPal uses camelCase; we normalize to snake_case for consistency.
+    Uses float math: value_usd is a display value that ends up in JSON as a
+    float anyway, so Decimal precision buys nothing here.
     """
-    if isinstance(data, list):
-        return [to_snake_case(item) for item in data]
-    if isinstance(data, dict):
-        return {
-            re.sub(r"(?<!^)(?=[A-Z])", "_", k).lower(): to_snake_case(v)
-            for k, v in data.items()
-        }
-    return data
+    # USD amounts need no rate lookup or rounding
+    if currency_code == "USD":
+        return float(value)
+    return round(float(value) * rates[currency_code], 2)
 
 
-def mask_transaction_ids(transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+async def _fetch_float_rates(currencies: Set[str]) -> Dict[str, float]:
     """
-    Mask the last 5 characters of transaction IDs for security.
+    Fetch USD rates keyed by currency code exactly as it appears in the data.
 
-    Replaces last 5 characters with asterisks (e.g., ABC123DEF456GHI789 -> ABC123DEF456GH*****)
+    Codes are upper-cased once here (per distinct code) so the per-row
+    conversion can use them as-is. Rates are cast to float once per request.
+    Non-string codes (e.g. a null currency_code) are skipped; the rows using
+    them end up with value_usd = None.
+    """
+    currencies = {code for code in currencies if isinstance(code, str)}
+    rates = await exchange_rate_service.get_rates_to_usd(currencies)
+    return {
+        code: float(rates[upper])
+        for code in currencies
+        if (upper := code.upper()) in rates
+    }
 
-    Args:
-        transactions: List of transaction dicts
 
-    Returns:
-        List of transactions with masked transaction IDs
+def _add_usd_to_transaction(tx: Dict[str, Any], rates: Dict[str, float]) -> bool:
     """
-    for tx in transactions:
-        try:
-            # Mask transaction_info.transaction_id
-            if "transaction_info" in tx and "transaction_id" in tx["transaction_info"]:
-                tx_id = tx["transaction_info"]["transaction_id"]
-                if tx_id and len(tx_id) > 5:
-                    # Keep all but last 5 chars, replace last 5 with asterisks
-                    tx["transaction_info"]["transaction_id"] = tx_id[:-5] + "*****"
+    Add value_usd/original_currency to a transaction's transaction_amount.
 
-            # Also mask top-level transaction_id if exists
-            if "transaction_id" in tx:
-                tx_id = tx["transaction_id"]
-                if tx_id and len(tx_id) > 5:
-                    tx["transaction_id"] = tx_id[:-5] + "*****"
+    Returns False if the conversion failed (value_usd is then None).
+    """
+    try:
+        # Extract transaction info
+        tx_info = tx.get("transaction_info", {})
+        tx_amount = tx_info.get("transaction_amount", {})
+
+        # Get amount and currency
+        amount_value = tx_amount.get("value")
+        currency_code = tx_amount.get("currency_code", "USD")
+
+        if amount_value is not None:
+            # Add USD amount to transaction_amount
+            usd_amount = _to_usd(amount_value, currency_code, rates)
+            tx_amount["value_usd"] = usd_amount
+            tx_amount["original_currency"] = currency_code
+
+            # Lazy %-style args: skipped entirely unless DEBUG is enabled
+            logger.debug(
+                "Converted %s %s to %s USD", amount_value, currency_code, usd_amount
+            )
+        return True
 
-        except Exception as e:
-            logger.warning(f"Failed to mask transaction ID: {e}")
+    except Exception as e:
+        # Log error but don't fail the whole request
+        logger.warning("Failed to convert transaction to USD: %s", e)
+        # Add null value to indicate conversion failed
+        if "transaction_info" in tx and "transaction_amount" in tx["transaction_info"]:
+            tx["transaction_info"]["transaction_amount"]["value_usd"] = None
+        return False
 
-    return transactions
 
+def _mask_transaction(tx: Dict[str, Any]) -> None:
+    """
+    Mask the last 5 characters of transaction IDs for security.
 
-async def add_usd_conversion(transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    Replaces last 5 characters with asterisks (e.g., ABC123DEF456GHI789 -> ABC123DEF456GH*****)
     """
-    Add USD conversion to transactions.
+    try:
+        # Mask transaction_info.transaction_id and top-level transaction_id if exists
+        tx_info = tx.get("transaction_info")
+        if tx_info:
+            _mask_id(tx_info)
+        _mask_id(tx)
+
+    except Exception as e:
+        logger.warning("Failed to mask transaction ID: %s", e)
 
-    Adds 'amount_usd' field to each transaction's transaction_info.
+
+async def get_transaction_rates(transactions: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Fetch USD rates for every currency present in the transactions.
 
     Args:
         transactions: List of transaction dicts
 
     Returns:
-        List of transactions with USD amounts added
+        Mapping of currency code to USD rate
     """
-    for tx in transactions:
-        try:
-            # Extract transaction info
-            tx_info = tx.get("transaction_info", {})
-            tx_amount = tx_info.get("transaction_amount", {})
+    currencies = {
+        tx.get("transaction_info", {}).get("transaction_amount", {}).get("currency_code", "USD")
+        for tx in transactions
+    }
+    return await _fetch_float_rates(currencies)
 
-            # Get amount and currency
-            amount_value = tx_amount.get("value")
-            currency_code = tx_amount.get("currency_code", "USD")
 
-            if amount_value is not None:
-                # Convert to USD
-                amount_float = float(amount_value)
-                usd_amount = await exchange_rate_service.convert_to_usd(
-                    amount_float, currency_code
-                )
+def process_transactions(
+    transactions: List[Dict[str, Any]],
+    rates: Optional[Dict[str, float]] = None,
+) -> bool:
+    """
+    Post-process transactions in a single pass.
 
-                # Add USD amount to transaction_amount
-                tx_amount["value_usd"] = float(usd_amount)
-                tx_amount["original_currency"] = currency_code
+    For each transaction: adds USD amounts (when rates are given), masks
+    transaction IDs, and normalizes keys to snake_case in place.
 
-                logger.debug(
-                    f"Converted {amount_value} {currency_code} to {usd_amount} USD"
-                )
+    Args:
+        transactions: List of transaction dicts
+        rates: Preloaded USD rates from get_transaction_rates(), or None to
+            skip USD conversion
 
-        except Exception as e:
-            # Log error but don't fail the whole request
-            logger.warning(f"Failed to convert transaction to USD: {e}")
-            # Add null value to indicate conversion failed
-            if "transaction_info" in tx and "transaction_amount" in tx["transaction_info"]:
-                tx["transaction_info"]["transaction_amount"]["value_usd"] = None
+    Returns:
+        True if every amount was converted (or conversion was skipped)
+    """
+    converted = True
+    for tx in transactions:
+        if rates is not None and not _add_usd_to_transaction(tx, rates):
+            converted = False
+        _mask_transaction(tx)
+        to_snake_case(tx)
 
-    return transactions
+    return converted
 
 
 async def add_usd_conversion_to_balance(balance_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Add USD conversion to balance data.
 
+    Rates for all balance currencies are fetched once up front.
+
     Args:
         balance_data: Balance response from PayPal
 
@@ -126,45 +172,36 @@ async def add_usd_conversion_to_balance(balance_data: Dict[str, Any]) -> Dict[st
         # Extract balances array
         balances = balance_data.get("balances", [])
 
+        # Collect total_balance/available_balance amounts to convert
+        amounts = []
         for balance in balances:
-            # Get total balance info
-            total_balance = balance.get("total_balance", {})
-            available_balance = balance.get("available_balance", {})
-
-            # Convert total_balance to USD
-            if total_balance:
-                value = total_balance.get("value")
-                currency_code = total_balance.get("currency_code", "USD")
-
-                if value is not None:
-                    value_float = float(value)
-                    usd_amount = await exchange_rate_service.convert_to_usd(
-                        value_float, currency_code
-                    )
-                    total_balance["value_usd"] = float(usd_amount)
-                    total_balance["original_currency"] = currency_code
-
-            # Convert available_balance to USD
-            if available_balance:
-                value = available_balance.get("value")
-                currency_code = available_balance.get("currency_code", "USD")
-
-                if value is not None:
-                    value_float = float(value)
-                    usd_amount = await exchange_rate_service.convert_to_usd(
-                        value_float, currency_code
-                    )
-                    available_balance["value_usd"] = float(usd_amount)
-                    available_balance["original_currency"] = currency_code
+            for key in ("total_balance", "available_balance"):
+                amount = balance.get(key, {})
+                if amount and amount.get("value") is not None:
+                    amounts.append(amount)
+
+        rates = await _fetch_float_rates(
+            {amount.get("currency_code", "USD") for amount in amounts}
+        )
+
+        for amount in amounts:
+            currency_code = amount.get("currency_code", "USD")
+            amount["value_usd"] = _to_usd(amount["value"], currency_code, rates)
+            amount["original_currency"] = currency_code
 
         balance_data["_usd_conversion_enabled"] = True
 
     except Exception as e:
-        logger.warning(f"Failed to convert balance to USD: {e}")
+        logger.warning("Failed to convert balance to USD: %s", e)
 
     return balance_data
 
 
+def _json_response(body: bytes) -> Response:
+    """Wrap pre-serialized JSON bytes in a response without re-encoding."""
+    return Response(content=body, media_type="application/json")
+
+
 @router.get("/balance")
 @limiter.limit("60/minute")
 async def get_balance(
@@ -176,20 +213,30 @@ async def get_balance(
 
     Returns cached balance info from PayPal with camelCase converted to snake_case.
     If convert_to_usd=true, adds value_usd field to balance amounts.
+    Identical queries are served from a short-lived response cache.
     """
+    cache_key = make_cache_key("balance", convert_to_usd=convert_to_usd)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return _json_response(cached)
+
     try:
-        response = await paypal_client.get_balances()
+        response = await get_paypal_client().get_balances()
 
         # Add USD conversion if requested
         if convert_to_usd:
             response = await add_usd_conversion_to_balance(response)
 
-        return to_snake_case(response)
+        body = orjson.dumps(to_snake_case(response))
+        # Don't cache a failed conversion: a brief rate outage would be served for the full TTL
+        if not convert_to_usd or response.get("_usd_conversion_enabled"):
+            response_cache[cache_key] = body
+        return _json_response(body)
     except httpx.HTTPStatusError as e:
         # Pass through PayPal error with original status code
         raise HTTPException(
             status_code=e.response.status_code,
-            detail=e.response.json(),
+            detail=orjson.loads(e.response.content),
         )
     except httpx.RequestError as e:
         # Network/service error
@@ -216,9 +263,23 @@ async def get_transactions(
     Query parameters are forwarded directly to PayPal's reporting API.
     Response is normalized from camelCase to snake_case.
     If convert_to_usd=true, adds value_usd field to each transaction.
+    Identical queries are served from a short-lived response cache.
     """
+    cache_key = make_cache_key(
+        "transactions",
+        start_date=start_date,
+        end_date=end_date,
+        page=page,
+        page_size=page_size,
+        transaction_status=transaction_status,
+        convert_to_usd=convert_to_usd,
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return _json_response(cached)
+
     try:
-        response = await paypal_client.get_transactions(
+        response = await get_paypal_client().get_transactions(
             start_date=start_date,
             end_date=end_date,
             page=page,
@@ -226,25 +287,25 @@ async def get_transactions(
             transaction_status=transaction_status,
         )
 
-        # Add USD conversion if requested
-        if convert_to_usd and "transaction_details" in response:
-            transactions = response["transaction_details"]
-            await add_usd_conversion(transactions)
-            response["transaction_details"] = transactions
-            response["_usd_conversion_enabled"] = True
-
-        # Mask transaction IDs for security (last 5 characters)
-        if "transaction_details" in response:
-            transactions = response["transaction_details"]
-            mask_transaction_ids(transactions)
-            response["transaction_details"] = transactions
-
-        return to_snake_case(response)
+        transactions = response.get("transaction_details")
+        converted = True
+        if transactions is not None:
+            # Fetch rates up front, then convert/mask/normalize in one pass
+            rates = await get_transaction_rates(transactions) if convert_to_usd else None
+            converted = process_transactions(transactions, rates)
+            if convert_to_usd:
+                response["_usd_conversion_enabled"] = True
+
+        body = orjson.dumps(to_snake_case(response, skip=("transaction_details",)))
+        # Don't cache rows left with value_usd=None; retry the rates next time
+        if converted:
+            response_cache[cache_key] = body
+        return _json_response(body)
     except httpx.HTTPStatusError as e:
         # Pass through PayPal error with original status code
         raise HTTPException(
             status_code=e.response.status_code,
-            detail=e.response.json(),
+            detail=orjson.loads(e.response.content),
         )
     except httpx.RequestError as e:
         # Network/service error
@@ -252,3 +313,15 @@ async def get_transactions(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail={"error": "service_unavailable", "message": str(e)},
         )
+    except InvalidDateRangeError as e:
+        # Client sent dates the PayPal client can't parse
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "invalid_request", "message": str(e)},
+        )
+    except orjson.JSONDecodeError:
+        # PayPal answered with a body that isn't valid JSON
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail={"error": "bad_gateway", "message": "Invalid response from PayPal"},
+        )
@@ -24,6 +24,9 @@ class Settings(BaseSettings):
     # Server config
     port: int = Field(8000, description="Application port")
     rate_limit_per_minute: int = Field(60, description="Rate limit per IP per minute")
+    response_cache_ttl_seconds: int = Field(
+        15, description="Seconds to cache processed balance/transactions responses"
+    )
 
     @property
     def paypal_base_url(self) -> str:
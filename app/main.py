@@ -13,7 +13,7 @@ from slowapi.errors import RateLimitExceeded
 from app.api.v1.paypal import router as paypal_router
 from app.config import settings
 from app.services.exchange_rate_service import exchange_rate_service
-from app.services.paypal_client import paypal_client
+from app.services.paypal_client import get_paypal_client
 from app.services.rate_limiter import limiter
 
 # Configure logging
@@ -26,12 +26,15 @@ logging.basicConfig(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Lifespan context manager - cleanup on shutdown."""
-    logging.info(f"Starting PayPal API service (mode: {settings.paypal_mode})")
-    logging.info(f"PayPal base URL: {settings.paypal_base_url}")
+    """Lifespan context manager - warm caches on startup, cleanup on shutdown."""
+    logging.info("Starting PayPal API service (mode: %s)", settings.paypal_mode)
+    logging.info("PayPal base URL: %s", settings.paypal_base_url)
+    await exchange_rate_service.warm_cache()
     logging.info("Exchange rate service initialized (using Frankfurter API)")
     yield
-    await paypal_client.close()
+    # Only close the PayPal client if a request actually created it
+    if get_paypal_client.cache_info().currsize:
+        await get_paypal_client().close()
     await exchange_rate_service.close()
     logging.info("PayPal API service stopped")
 
@@ -1,11 +1,15 @@
 """Exchange rate service using Frankfurter API for currency conversion."""
 
+import asyncio
 import logging
-import time
 from decimal import Decimal
-from typing import Any, Dict, Optional
+from typing import Dict, Set
 
 import httpx
+import orjson
+from cachetools import TTLCache
+
+from app.utils.http import body_text
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -30,24 +34,21 @@ class ExchangeRateService:
 
     def __init__(self) -> None:
         """Initialize exchange rate service with cache."""
-        # Rate cache: {currency: {"rate": Decimal, "timestamp": int}}
-        self._rate_cache: Dict[str, Dict[str, Any]] = {}
-        # httpx client with 5s timeout
-        self._client = httpx.AsyncClient(timeout=httpx.Timeout(5.0))
+        # Rate cache: {currency: Decimal}, entries expire after CACHE_TTL_SECONDS
+        self._rate_cache: TTLCache = TTLCache(maxsize=256, ttl=CACHE_TTL_SECONDS)
+        # In-flight fetches: {currency: Future[Decimal]} so concurrent misses share one API call
+        self._inflight: Dict[str, "asyncio.Future[Decimal]"] = {}
+        # httpx client with HTTP/2, 5s timeout (2s connect) and keepalive pooling
+        self._client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(5.0, connect=2.0),
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        )
 
     async def close(self) -> None:
         """Close the httpx client (call on app shutdown)."""
         await self._client.aclose()
 
-    def _is_cache_valid(self, currency: str) -> bool:
-        """Check if cached rate for currency is still valid."""
-        if currency not in self._rate_cache:
-            return False
-
-        cached = self._rate_cache[currency]
-        now = int(time.time())
-        return cached["timestamp"] + CACHE_TTL_SECONDS > now
-
     async def _fetch_rate_from_api(self, from_currency: str, to_currency: str = "USD") -> Decimal:
         """
         Fetch exchange rate from Frankfurter API.
@@ -70,13 +71,13 @@ class ExchangeRateService:
         url = f"{FRANKFURTER_BASE_URL}/latest"
         params = {"from": from_currency, "to": to_currency}
 
-        logger.info(f"Fetching exchange rate: {from_currency} -> {to_currency}")
+        logger.debug("Fetching exchange rate: %s -> %s", from_currency, to_currency)
 
         try:
             response = await self._client.get(url, params=params)
             response.raise_for_status()
 
-            data = response.json()
+            data = orjson.loads(response.content)
 
             # Extract rate from response
             # Response format: {"amount": 1.0, "base": "EUR", "date": "2025-12-29", "rates": {"USD": 1.234}}
@@ -85,26 +86,65 @@ class ExchangeRateService:
             if rate is None:
                 raise ValueError(f"Rate for {to_currency} not found in API response")
 
-            logger.info(f"Rate fetched: {from_currency} -> {to_currency} = {rate}")
+            logger.info("Rate fetched: %s -> %s = %s", from_currency, to_currency, rate)
             return Decimal(str(rate))
 
         except httpx.HTTPStatusError as e:
             logger.error(
-                f"Exchange rate API error: {e.response.status_code} - {e.response.text}"
+                "Exchange rate API error: %s - %s", e.response.status_code, body_text(e.response)
             )
             raise
         except httpx.RequestError as e:
-            logger.error(f"Network error fetching exchange rate: {e}")
+            logger.error("Network error fetching exchange rate: %s", e)
             raise
         except (KeyError, ValueError) as e:
-            logger.error(f"Error parsing exchange rate response: {e}")
+            logger.error("Error parsing exchange rate response: %s", e)
             raise
 
+    async def warm_cache(self) -> None:
+        """
+        Preload rates for every supported currency with a single API call.
+
+        Fetches USD -> X rates from Frankfurter once and caches the inverse
+        (X -> USD) for each currency, so request handlers rarely block on a
+        rate fetch. Errors are logged and ignored; rates are then fetched
+        lazily as before.
+        """
+        url = f"{FRANKFURTER_BASE_URL}/latest"
+
+        try:
+            response = await self._client.get(url, params={"from": "USD"})
+            response.raise_for_status()
+
+            # Response format: {"amount": 1.0, "base": "USD", "date": "2025-12-29", "rates": {"EUR": 0.95, ...}}
+            data = orjson.loads(response.content)
+            rates = data.get("rates") if isinstance(data, dict) else None
+            if not isinstance(rates, dict):
+                raise ValueError("Response has no rates mapping")
+
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning("Failed to warm exchange rate cache: %s", e)
+            return
+
+        for currency, rate in rates.items():
+            try:
+                if rate:
+                    self._rate_cache[currency.upper()] = Decimal("1") / Decimal(str(rate))
+            except (ArithmeticError, ValueError, TypeError):
+                # Skip malformed entries; those currencies are fetched lazily
+                logger.warning(
+                    "Failed to warm exchange rate cache for %s: invalid rate %r", currency, rate
+                )
+
+        logger.info("Exchange rate cache warmed with %d currencies", len(rates))
+
     async def get_rate_to_usd(self, from_currency: str) -> Decimal:
         """
         Get exchange rate from currency to USD.
 
         Uses cache if available and valid, otherwise fetches from API.
+        Concurrent callers missing the cache for the same currency share a
+        single API call.
 
         Args:
             from_currency: Source currency code (e.g., "EUR", "GBP")
@@ -119,23 +159,92 @@ class ExchangeRateService:
         # Normalize currency code
         from_currency = from_currency.upper()
 
-        # Check cache
-        if self._is_cache_valid(from_currency):
-            logger.info(f"Cache hit for {from_currency}")
-            return self._rate_cache[from_currency]["rate"]
+        # Check cache (TTLCache drops expired entries itself)
+        try:
+            rate = self._rate_cache[from_currency]
+            logger.debug("Cache hit for %s", from_currency)
+            return rate
+        except KeyError:
+            pass
+
+        # Join a fetch already in progress for this currency
+        inflight = self._inflight.get(from_currency)
+        if inflight is not None:
+            try:
+                # Shield so cancelling this joiner can't cancel the owner's fetch
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # The owner was cancelled; fetch ourselves unless it is this
+                # task being cancelled
+                current = asyncio.current_task()
+                if not inflight.cancelled() or (current is not None and current.cancelling()):
+                    raise
 
         # Fetch from API
-        logger.info(f"Cache miss for {from_currency}, fetching from API")
-        rate = await self._fetch_rate_from_api(from_currency, "USD")
+        logger.debug("Cache miss for %s, fetching from API", from_currency)
+        future: "asyncio.Future[Decimal]" = asyncio.get_running_loop().create_future()
+        self._inflight[from_currency] = future
+        try:
+            rate = await self._fetch_rate_from_api(from_currency, "USD")
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+                # Mark retrieved so an unawaited future doesn't log a warning
+                future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            # Always drop our entry (including when cancelled) so later callers
+            # start a fresh fetch instead of joining a dead future
+            if self._inflight.get(from_currency) is future:
+                del self._inflight[from_currency]
 
         # Update cache
-        self._rate_cache[from_currency] = {
-            "rate": rate,
-            "timestamp": int(time.time()),
-        }
+        self._rate_cache[from_currency] = rate
+        if not future.done():
+            future.set_result(rate)
 
         return rate
 
+    async def get_rates_to_usd(self, currencies: Set[str]) -> Dict[str, Decimal]:
+        """
+        Get exchange rates to USD for several currencies at once.
+
+        Uncached currencies are fetched concurrently. Currencies whose rate
+        could not be fetched are omitted from the result.
+
+        Args:
+            currencies: Source currency codes (e.g., {"EUR", "GBP"})
+
+        Returns:
+            Mapping of upper-cased currency code to USD rate
+
+        Examples:
+            >>> rates = await service.get_rates_to_usd({"EUR", "USD"})
+            >>> print(rates)  # {"EUR": Decimal("1.234"), "USD": Decimal("1.0")}
+        """
+        # USD needs no lookup; non-string codes cannot be looked up at all
+        codes = list(
+            {currency.upper() for currency in currencies if isinstance(currency, str)}
+            - {"USD"}
+        )
+        results = await asyncio.gather(
+            *[self.get_rate_to_usd(code) for code in codes],
+            return_exceptions=True,
+        )
+
+        rates: Dict[str, Decimal] = {"USD": Decimal("1.0")}
+        for code, rate in zip(codes, results):
+            # BaseException: a cancelled lookup comes back as CancelledError
+            if isinstance(rate, BaseException):
+                logger.warning("Failed to get exchange rate for %s: %s", code, rate)
+                continue
+            rates[code] = rate
+
+        return rates
+
     async def convert_to_usd(self, amount: float, from_currency: str) -> Decimal:
         """
         Convert amount from currency to USD.
@@ -1,16 +1,21 @@
 """PayPal API client with OAuth2 and in-memory token caching."""
 
 import asyncio
-import json
+import base64
 import logging
+import random
 import time
 import traceback
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import chain
 from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
+import orjson
 
 from app.config import settings
+from app.utils.http import body_text
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -18,6 +23,94 @@ logger = logging.getLogger(__name__)
 # PayPal API constants
 MAX_DATE_RANGE_DAYS = 31
 MAX_CONCURRENT_REQUESTS = 2
+# Upper bound on upstream page requests (all chunks, all pages) per split query
+MAX_PAGES_PER_SPLIT_QUERY = 50
+# Page size for split-query chunk fetches (PayPal's maximum for this endpoint)
+SPLIT_QUERY_PAGE_SIZE = 500
+SECONDS_PER_DAY = 86400
+
+# Per-stage timeouts: fail slow connects fast so retries start sooner, but give
+# healthy reads room to finish (transactions bodies can be large)
+DEFAULT_TIMEOUT = httpx.Timeout(connect=2.0, read=15.0, write=5.0, pool=1.0)
+TRANSACTIONS_TIMEOUT = httpx.Timeout(connect=2.0, read=30.0, write=5.0, pool=1.0)
+TOKEN_TIMEOUT = httpx.Timeout(connect=2.0, read=5.0, write=5.0, pool=1.0)
+
+
+class InvalidDateRangeError(ValueError):
+    """Raised when get_transactions() is given dates it cannot parse."""
+
+
+# Param keys whose values are masked in error logs
+_SENSITIVE = frozenset({"access_token", "client_secret", "Authorization"})
+
+# OAuth2 client credentials grant, sent as a pre-encoded form body
+_TOKEN_BODY_BYTES = b"grant_type=client_credentials"
+
+# Retry backoff ceiling in seconds (full jitter is drawn below this)
+MAX_RETRY_DELAY_SECONDS = 30.0
+
+# Transient statuses (rate limit, gateway/provider hiccups) that are retried
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+TOKEN_PATH = "/v1/oauth2/token"
+BALANCES_PATH = "/v1/reporting/balances"
+TRANSACTIONS_PATH = "/v1/reporting/transactions"
+
+
+def _parse_iso_utc(value: str) -> int:
+    """
+    Parse an ISO 8601 date into a Unix timestamp (whole seconds).
+
+    Dates without a timezone are treated as UTC. Python 3.11's C
+    fromisoformat accepts the trailing "Z" directly, so no rewrite is needed.
+    """
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _format_iso_utc(timestamp: int) -> str:
+    """Format a Unix timestamp as ISO 8601 UTC (YYYY-MM-DDTHH:MM:SSZ)."""
+    return "%04d-%02d-%02dT%02d:%02d:%02dZ" % time.gmtime(timestamp)[:6]
+
+
+def _backoff_delay(attempt: int, base_delay: float) -> float:
+    """Full-jitter exponential backoff, capped at MAX_RETRY_DELAY_SECONDS."""
+    return random.uniform(0, min(MAX_RETRY_DELAY_SECONDS, base_delay * (2**attempt)))
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Delay requested by a Retry-After header in seconds, if present and numeric."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return min(MAX_RETRY_DELAY_SECONDS, max(0.0, float(value)))
+    except ValueError:
+        # HTTP-date form: fall back to jittered backoff
+        return None
+
+
+def _utc_now_iso() -> str:
+    """Current UTC time as ISO 8601 with microseconds, without a datetime allocation."""
+    now = time.time()
+    return "%04d-%02d-%02dT%02d:%02d:%02d.%06dZ" % (
+        *time.gmtime(now)[:6],
+        int(now % 1 * 1_000_000),
+    )
+
+
+class _LazyJSON:
+    """Log payload that is serialized to indented JSON only when formatted."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self.data = data
+
+    def __str__(self) -> str:
+        return orjson.dumps(self.data, option=orjson.OPT_INDENT_2, default=str).decode()
 
 
 def _log_error_details(
@@ -30,10 +123,14 @@ def _log_error_details(
     response_body: Optional[str] = None,
     exception: Optional[Exception] = None,
     extra_context: Optional[Dict[str, Any]] = None,
+    capture_traceback: bool = False,
 ) -> None:
     """
     Log detailed error information for debugging.
 
+    Stack traces are expensive to format, so they are only captured when
+    capture_traceback is set (final failures, not retryable errors).
+
     Args:
         logger_instance: Logger instance to use
         error_type: Type of error (e.g., "HTTPStatusError", "RequestError")
@@ -41,21 +138,29 @@ def _log_error_details(
         method: HTTP method
         params: Query parameters
         status_code: HTTP status code (if available)
-        response_body: Response body text (if available)
+        response_body: Response body text, already truncated (if available)
         exception: Exception object (if available)
         extra_context: Additional context data
+        capture_traceback: Include the current stack trace (use for final failures)
     """
+    if not logger_instance.isEnabledFor(logging.ERROR):
+        return
+
     error_details = {
         "error_type": error_type,
         "method": method,
         "url": url,
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _utc_now_iso(),
     }
 
     if params:
-        # Mask sensitive data in params
-        safe_params = {k: v for k, v in params.items()}
-        error_details["params"] = safe_params
+        # Mask sensitive data in params (copy only when there is something to mask)
+        if _SENSITIVE.isdisjoint(params):
+            error_details["params"] = params
+        else:
+            error_details["params"] = {
+                k: ("***" if k in _SENSITIVE else v) for k, v in params.items()
+            }
 
     if status_code:
         error_details["status_code"] = status_code
@@ -63,7 +168,7 @@ def _log_error_details(
     if response_body:
         try:
             # Try to parse as JSON for better formatting
-            parsed = json.loads(response_body)
+            parsed = orjson.loads(response_body)
             error_details["response"] = parsed
 
             # Extract PayPal debug_id if available
@@ -73,23 +178,26 @@ def _log_error_details(
             # Extract error details if available
             if isinstance(parsed, dict) and "details" in parsed:
                 error_details["error_details"] = parsed["details"]
-        except (json.JSONDecodeError, TypeError):
-            # If not JSON, log as text (truncate if too long)
-            error_details["response_text"] = response_body[:1000]
+        except (orjson.JSONDecodeError, TypeError):
+            # If not JSON, log as text (already truncated by caller)
+            error_details["response_text"] = response_body
 
     if exception:
         error_details["exception_type"] = type(exception).__name__
         error_details["exception_message"] = str(exception)
+
+    if capture_traceback:
         # Add stack trace for debugging
         error_details["traceback"] = traceback.format_exc()
 
     if extra_context:
         error_details.update(extra_context)
 
-    # Log as formatted JSON for easy parsing
+    # Log as formatted JSON for easy parsing (serialized only if a handler formats it)
     logger_instance.error(
-        f"PayPal API Error - {error_type}",
-        extra={"error_details": json.dumps(error_details, indent=2)},
+        "PayPal API Error - %s",
+        error_type,
+        extra={"error_details": _LazyJSON(error_details)},
     )
 
     # Also log a simplified one-liner for quick scanning
@@ -101,66 +209,197 @@ def _log_error_details(
     logger_instance.error(summary)
 
 
+class AdmissionController:
+    """
+    Concurrency limiter whose limit can be changed at runtime.
+
+    Unlike asyncio.Semaphore, the limit can be raised or lowered safely while
+    requests are in flight: waiters re-check the active count against the
+    current limit whenever a slot is released or the limit changes.
+
+    Release is synchronous and wakes every waiter, so a waiter cancelled after
+    being woken can't swallow the wakeup others need, and exiting the context
+    during cancellation never leaks a slot.
+    """
+
+    def __init__(self, limit: int) -> None:
+        """Initialize with the maximum number of concurrent holders."""
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        self._limit = limit
+        self._active = 0
+        self._waiters: List["asyncio.Future[None]"] = []
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit."""
+        return self._limit
+
+    async def set_limit(self, limit: int) -> None:
+        """Change the concurrency limit and wake waiters that may now proceed."""
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        self._limit = limit
+        self._wake_all()
+
+    async def acquire(self) -> None:
+        """Wait until a slot is free, then take it."""
+        while self._active >= self._limit:
+            waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                raise
+        self._active += 1
+
+    def release(self) -> None:
+        """Give a slot back and wake waiters to re-check for it."""
+        self._active -= 1
+        self._wake_all()
+
+    def _wake_all(self) -> None:
+        """Wake every waiter; each re-checks the limit and re-queues if still full."""
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def __aenter__(self) -> "AdmissionController":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
 class PayPalClient:
     """PayPal API client with OAuth2 client credentials flow and token caching."""
 
-    def __init__(self) -> None:
-        """Initialize client with in-memory token cache and httpx async client."""
-        # Token cache: {mode: {"token": str, "expires_at": int}}
+    def __init__(self, client: Optional[httpx.AsyncClient] = None) -> None:
+        """
+        Initialize client with in-memory token cache and httpx async client.
+
+        Args:
+            client: Optional shared httpx client (e.g. a MockTransport in tests).
+                An injected client is not closed by close().
+        """
+        # Settings are fixed for the process; bind them once instead of going
+        # through the settings object (and its computed base URL) per request
+        self._mode = settings.paypal_mode
+        self._base_url = settings.paypal_base_url
+        self._client_id = settings.paypal_client_id
+        # Credentials are immutable, so base64-encode the Basic auth header once
+        credentials = f"{settings.paypal_client_id}:{settings.paypal_client_secret}".encode()
+        basic_auth = "Basic " + base64.b64encode(credentials).decode()
+        # Token request invariants, reused by every refresh
+        self._token_url = f"{self._base_url}{TOKEN_PATH}"
+        self._token_headers = {
+            "Authorization": basic_auth,
+            "Content-Type": "application/x-www-form-urlencoded",
+        }
+        # Token cache: {mode: {"token": str, "expires_at": float}}, expiry on the
+        # monotonic clock so wall-clock (NTP) jumps can't skew token lifetimes
         self._token_cache: Dict[str, Dict[str, Any]] = {}
-        # httpx client with 5s timeout and connection pooling
-        self._client = httpx.AsyncClient(
-            timeout=httpx.Timeout(5.0),
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
+        # Serializes token refreshes so concurrent cache misses fetch only once
+        self._token_lock = asyncio.Lock()
+        # Shared limit on concurrent chunk requests across all callers
+        self._admit = AdmissionController(MAX_CONCURRENT_REQUESTS)
+        # In-flight chunk fetches: {(mode, start, end, page, page_size, status): Future[bytes]}
+        # so concurrent identical requests share one upstream call
+        self._inflight: Dict[Tuple[Any, ...], "asyncio.Future[bytes]"] = {}
+        # httpx client with HTTP/2 and connection pooling. Keepalive is held
+        # for 75s (nginx default) so dashboard polling reuses TLS connections.
+        self._owns_client = client is None
+        self._client = client if client is not None else httpx.AsyncClient(
+            http2=True,
+            timeout=DEFAULT_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=75.0,
+            ),
         )
 
     async def close(self) -> None:
-        """Close the httpx client (call on app shutdown)."""
-        await self._client.aclose()
+        """Close the httpx client (call on app shutdown); injected clients are left open."""
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def set_concurrency(self, limit: int) -> None:
+        """Change the maximum number of concurrent PayPal chunk requests."""
+        await self._admit.set_limit(limit)
 
     def _get_cache_key(self) -> str:
         """Get cache key based on current PayPal mode."""
-        return settings.paypal_mode
+        return self._mode
 
-    async def _get_access_token(self) -> str:
+    async def _get_access_token(self, stale_token: Optional[str] = None) -> str:
         """
         Get OAuth2 access token from cache or fetch new one.
 
         Returns cached token if valid, otherwise fetches new token from PayPal.
         Token refreshed 60s before expiry to prevent edge cases.
+        Concurrent callers that miss the cache, or that were rejected with the
+        same stale token, wait for a single refresh instead of each requesting
+        a token.
+
+        Args:
+            stale_token: Token PayPal rejected (e.g. with a 401). The cached
+                token is only reused if it differs from this one.
         """
         cache_key = self._get_cache_key()
-        cached = self._token_cache.get(cache_key)
 
-        now = int(time.time())
-        if cached and cached["expires_at"] > now:
-            logger.info(f"Token cache hit (mode: {cache_key})")
+        # Fast path: no lock needed for a valid cached token
+        token = self._get_cached_token(cache_key)
+        if token and token != stale_token:
+            return token
+
+        async with self._token_lock:
+            # Re-check: another coroutine may have refreshed while we waited
+            token = self._get_cached_token(cache_key)
+            if token and token != stale_token:
+                return token
+
+            return await self._fetch_access_token(cache_key)
+
+    def _get_cached_token(self, cache_key: str) -> Optional[str]:
+        """Return the cached token for cache_key if it has not expired."""
+        cached = self._token_cache.get(cache_key)
+        if cached and cached["expires_at"] > time.monotonic():
+            logger.info("Token cache hit (mode: %s)", cache_key)
             return cached["token"]
+        return None
 
-        logger.info(f"Fetching new token from PayPal (mode: {cache_key})")
-        logger.debug(f"PayPal base URL: {settings.paypal_base_url}")
-        logger.debug(f"Client ID: {settings.paypal_client_id[:10]}...{settings.paypal_client_id[-4:]}")
+    async def _fetch_access_token(self, cache_key: str) -> str:
+        """Fetch a new OAuth2 access token from PayPal and cache it."""
+        now = time.monotonic()
 
-        # Fetch new token with basic auth
-        auth = httpx.BasicAuth(
-            username=settings.paypal_client_id,
-            password=settings.paypal_client_secret,
-        )
+        logger.info("Fetching new token from PayPal (mode: %s)", cache_key)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("PayPal base URL: %s", self._base_url)
+            logger.debug("Client ID: %s...%s", self._client_id[:10], self._client_id[-4:])
 
-        token_url = f"{settings.paypal_base_url}/v1/oauth2/token"
-        logger.info(f"POST {token_url}")
+        token_url = self._token_url
+        logger.info("POST %s", token_url)
+        # Error body, decoded once and reused by the HTTPStatusError handler
+        body: Optional[str] = None
 
         try:
             response = await self._client.post(
                 token_url,
-                auth=auth,
-                data={"grant_type": "client_credentials"},
+                headers=self._token_headers,
+                content=_TOKEN_BODY_BYTES,
+                timeout=TOKEN_TIMEOUT,
             )
 
-            logger.info(f"Token response status: {response.status_code}")
+            logger.info("Token response status: %s", response.status_code)
 
             if response.status_code != 200:
-                logger.error(f"Token request failed: {response.status_code} - {response.text}")
+                body = body_text(response)
+                logger.error("Token request failed: %s - %s", response.status_code, body)
                 # Log detailed error information
                 _log_error_details(
                     logger_instance=logger,
@@ -168,20 +407,20 @@ class PayPalClient:
                     url=token_url,
                     method="POST",
                     status_code=response.status_code,
-                    response_body=response.text,
+                    response_body=body,
                     extra_context={
                         "mode": cache_key,
-                        "client_id_prefix": settings.paypal_client_id[:10],
+                        "client_id_prefix": self._client_id[:10],
                     },
                 )
 
             response.raise_for_status()
 
-            data = response.json()
+            data = orjson.loads(response.content)
             token = data["access_token"]
             expires_in = data.get("expires_in", 32400)  # PayPal default: 9 hours
 
-            logger.info(f"Token obtained, expires_in: {expires_in}s")
+            logger.info("Token obtained, expires_in: %ss", expires_in)
 
         except httpx.HTTPStatusError as e:
             _log_error_details(
@@ -190,9 +429,10 @@ class PayPalClient:
                 url=token_url,
                 method="POST",
                 status_code=e.response.status_code,
-                response_body=e.response.text,
+                response_body=body if body is not None else body_text(e.response),
                 exception=e,
                 extra_context={"mode": cache_key},
+                capture_traceback=True,
             )
             raise
         except httpx.RequestError as e:
@@ -213,6 +453,7 @@ class PayPalClient:
                 method="POST",
                 exception=e,
                 extra_context={"mode": cache_key},
+                capture_traceback=True,
             )
             raise
 
@@ -229,7 +470,22 @@ class PayPalClient:
         method: str,
         path: str,
         params: Optional[Dict[str, Any]] = None,
+        timeout: httpx.Timeout = DEFAULT_TIMEOUT,
     ) -> Dict[str, Any]:
+        """
+        Make authenticated request to PayPal API and decode the JSON response.
+
+        See _request_bytes for arguments and retry behaviour.
+        """
+        return orjson.loads(await self._request_bytes(method, path, params=params, timeout=timeout))
+
+    async def _request_bytes(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+    ) -> bytes:
         """
         Make authenticated request to PayPal API with retry logic.
 
@@ -237,9 +493,10 @@ class PayPalClient:
             method: HTTP method (GET, POST, etc.)
             path: API path (e.g., /v1/reporting/balances)
             params: Query parameters
+            timeout: Per-call timeout override
 
         Returns:
-            JSON response as dict
+            Raw JSON response body
 
         Raises:
             httpx.HTTPStatusError: On 4xx/5xx responses
@@ -249,38 +506,66 @@ class PayPalClient:
         max_retries = 3
         base_delay = 0.5
 
-        url = f"{settings.paypal_base_url}{path}"
-        logger.info(f"{method} {url} (attempt {1}/{max_retries})")
+        url = f"{self._base_url}{path}"
+        logger.info("%s %s (attempt 1/%d)", method, url, max_retries)
         if params:
-            logger.debug(f"Query params: {params}")
+            logger.debug("Query params: %s", params)
+
+        # Auth headers are built once and reused across retries; only a 401
+        # forces a token refresh (of the token that was rejected)
+        headers: Optional[Dict[str, str]] = None
+        token: Optional[str] = None
+        stale_token: Optional[str] = None
 
         for attempt in range(max_retries):
+            # Error body, decoded once and reused by the HTTPStatusError handler
+            body: Optional[str] = None
             try:
-                token = await self._get_access_token()
-                headers = {
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json",
-                }
+                if headers is None:
+                    token = await self._get_access_token(stale_token=stale_token)
+                    headers = {
+                        "Authorization": f"Bearer {token}",
+                        "Content-Type": "application/json",
+                    }
 
                 response = await self._client.request(
                     method=method,
                     url=url,
                     headers=headers,
                     params=params,
+                    timeout=timeout,
                 )
 
-                logger.info(f"Response status: {response.status_code} (attempt {attempt + 1}/{max_retries})")
+                logger.info(
+                    "Response status: %s (attempt %d/%d)", response.status_code, attempt + 1, max_retries
+                )
 
-                # Handle 401: clear cache and retry once
+                # Handle 401: refresh token and retry once
                 if response.status_code == 401 and attempt == 0:
-                    logger.warning("Got 401, clearing token cache and retrying...")
-                    cache_key = self._get_cache_key()
-                    self._token_cache.pop(cache_key, None)
+                    logger.warning("Got 401, refreshing token and retrying...")
+                    headers = None
+                    stale_token = token
+                    continue
+
+                # Retry transient 429/5xx, honoring Retry-After when given
+                if response.status_code in RETRYABLE_STATUS_CODES and attempt < max_retries - 1:
+                    retry_delay = _retry_after_seconds(response)
+                    if retry_delay is None:
+                        retry_delay = _backoff_delay(attempt, base_delay)
+                    logger.warning(
+                        "Got %s, retrying in %.2fs (attempt %d/%d)",
+                        response.status_code,
+                        retry_delay,
+                        attempt + 1,
+                        max_retries,
+                    )
+                    await asyncio.sleep(retry_delay)
                     continue
 
                 # Log error responses for debugging
                 if response.status_code >= 400:
-                    logger.error(f"PayPal API error {response.status_code}: {response.text[:500]}")
+                    body = body_text(response)
+                    logger.error("PayPal API error %s: %.500s", response.status_code, body)
                     # Log detailed error information
                     _log_error_details(
                         logger_instance=logger,
@@ -289,21 +574,23 @@ class PayPalClient:
                         method=method,
                         params=params,
                         status_code=response.status_code,
-                        response_body=response.text,
+                        response_body=body,
                         extra_context={
                             "attempt": attempt + 1,
                             "max_retries": max_retries,
-                            "mode": settings.paypal_mode,
+                            "mode": self._mode,
                         },
                     )
 
                 response.raise_for_status()
-                logger.info(f"Request successful")
-                return response.json()
+                logger.info("Request successful")
+                return response.content
 
             except httpx.HTTPStatusError as e:
-                # Retry 401 once after clearing cache
+                # Retry 401 once with a fresh token
                 if e.response.status_code == 401 and attempt == 0:
+                    headers = None
+                    stale_token = token
                     continue
 
                 # Log detailed error with full context
@@ -314,19 +601,22 @@ class PayPalClient:
                     method=method,
                     params=params,
                     status_code=e.response.status_code,
-                    response_body=e.response.text,
+                    response_body=body if body is not None else body_text(e.response),
                     exception=e,
                     extra_context={
                         "attempt": attempt + 1,
                         "max_retries": max_retries,
-                        "mode": settings.paypal_mode,
+                        "mode": self._mode,
                         "will_retry": False,
                     },
+                    capture_traceback=True,
                 )
                 raise
 
             except httpx.RequestError as e:
                 will_retry = attempt < max_retries - 1
+                # Full jitter so fanned-out chunks don't retry in lockstep
+                retry_delay = _backoff_delay(attempt, base_delay) if will_retry else None
 
                 # Log detailed network error
                 _log_error_details(
@@ -340,14 +630,15 @@ class PayPalClient:
                         "attempt": attempt + 1,
                         "max_retries": max_retries,
                         "will_retry": will_retry,
-                        "retry_delay": base_delay * (2**attempt) if will_retry else None,
-                        "mode": settings.paypal_mode,
+                        "retry_delay": retry_delay,
+                        "mode": self._mode,
                     },
+                    capture_traceback=not will_retry,
                 )
 
                 # Retry network errors with exponential backoff
                 if will_retry:
-                    await asyncio.sleep(base_delay * (2**attempt))
+                    await asyncio.sleep(retry_delay)
                     continue
                 raise
 
@@ -363,8 +654,9 @@ class PayPalClient:
                     extra_context={
                         "attempt": attempt + 1,
                         "max_retries": max_retries,
-                        "mode": settings.paypal_mode,
+                        "mode": self._mode,
                     },
+                    capture_traceback=True,
                 )
                 raise
 
@@ -372,7 +664,7 @@ class PayPalClient:
 
     async def get_balances(self) -> Dict[str, Any]:
         """Get PayPal account balances."""
-        return await self._request("GET", "/v1/reporting/balances")
+        return await self._request("GET", BALANCES_PATH)
 
     def _split_date_range(self, start_date: str, end_date: str) -> List[Tuple[str, str]]:
         """
@@ -385,27 +677,37 @@ class PayPalClient:
         Returns:
             List of (start_date, end_date) tuples
         """
-        start = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
-        end = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
-
-        ranges = []
-        current_start = start
-
-        while current_start < end:
-            # Calculate end of current chunk (max 31 days)
-            current_end = min(current_start + timedelta(days=MAX_DATE_RANGE_DAYS), end)
+        return self._split_date_range_parsed(_parse_iso_utc(start_date), _parse_iso_utc(end_date))
 
-            # Format as ISO 8601
-            range_start = current_start.strftime("%Y-%m-%dT%H:%M:%SZ")
-            range_end = current_end.strftime("%Y-%m-%dT%H:%M:%SZ")
-
-            ranges.append((range_start, range_end))
-            logger.debug(f"Date range chunk: {range_start} to {range_end}")
+    def _split_date_range_parsed(self, start_ts: int, end_ts: int) -> List[Tuple[str, str]]:
+        """
+        Split an already-parsed range (Unix timestamps) into chunks of MAX_DATE_RANGE_DAYS.
 
-            # Move to next chunk
-            current_start = current_end
+        Args:
+            start_ts: Range start as a Unix timestamp
+            end_ts: Range end as a Unix timestamp
 
-        logger.info(f"Split date range into {len(ranges)} chunks (max {MAX_DATE_RANGE_DAYS} days each)")
+        Returns:
+            List of (start_date, end_date) ISO 8601 tuples
+        """
+        step = MAX_DATE_RANGE_DAYS * SECONDS_PER_DAY
+        # Number of chunks (ceiling division); only the last one can be short
+        count = max(0, -(-(end_ts - start_ts) // step))
+        if not count:
+            return []
+
+        # Full-length chunks come straight from the index (sized up front, no
+        # min() per chunk); the final chunk ends at end_ts
+        last_start = start_ts + (count - 1) * step
+        ranges = [
+            (_format_iso_utc(chunk_start), _format_iso_utc(chunk_start + step))
+            for chunk_start in range(start_ts, last_start, step)
+        ]
+        ranges.append((_format_iso_utc(last_start), _format_iso_utc(end_ts)))
+
+        logger.info(
+            "Split date range into %d chunks (max %d days each)", len(ranges), MAX_DATE_RANGE_DAYS
+        )
         return ranges
 
     async def _get_transactions_chunk(
@@ -416,7 +718,14 @@ class PayPalClient:
         page_size: int,
         transaction_status: Optional[str],
     ) -> Dict[str, Any]:
-        """Get transactions for a single date range chunk."""
+        """
+        Get transactions for a single date range chunk.
+
+        Concurrent callers asking for the same chunk share a single upstream
+        request. The shared result is the raw body, decoded per caller, since
+        the API layer mutates responses in place. Result caching is left to the
+        API layer's response cache.
+        """
         params = {
             "start_date": start_date,
             "end_date": end_date,
@@ -426,7 +735,42 @@ class PayPalClient:
         if transaction_status:
             params["transaction_status"] = transaction_status
 
-        return await self._request("GET", "/v1/reporting/transactions", params=params)
+        # Join a fetch already in progress for this chunk
+        key = (self._mode, start_date, end_date, page, page_size, transaction_status)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                # Shield so cancelling this joiner can't cancel the owner's fetch
+                return orjson.loads(await asyncio.shield(inflight))
+            except asyncio.CancelledError:
+                # The owning caller was cancelled (e.g. its fan-out aborted);
+                # fetch ourselves unless it is this task being cancelled
+                current = asyncio.current_task()
+                if not inflight.cancelled() or (current is not None and current.cancelling()):
+                    raise
+
+        future: "asyncio.Future[bytes]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            body = await self._request_bytes(
+                "GET", TRANSACTIONS_PATH, params=params, timeout=TRANSACTIONS_TIMEOUT
+            )
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+                # Mark retrieved so an unawaited future doesn't log a warning
+                future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+        if not future.done():
+            future.set_result(body)
+        return orjson.loads(body)
 
     async def get_transactions(
         self,
@@ -440,7 +784,11 @@ class PayPalClient:
         Get PayPal transactions with automatic date range splitting.
 
         Automatically splits date ranges > 31 days into multiple parallel requests
-        and merges the results.
+        and merges the results. Split queries fetch every page of every chunk
+        at SPLIT_QUERY_PAGE_SIZE, so `page` and `page_size` only apply to
+        single-range queries and the merged result is in date order. Requests
+        beyond MAX_PAGES_PER_SPLIT_QUERY are skipped and the result is flagged
+        with `_truncated`.
 
         Args:
             start_date: ISO 8601 start date
@@ -451,16 +799,19 @@ class PayPalClient:
 
         Returns:
             Merged transaction response with all transactions
+
+        Raises:
+            InvalidDateRangeError: On invalid dates
         """
         try:
             # Check if date range needs splitting
-            start = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
-            end = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
-            days_diff = (end - start).days
+            start_ts = _parse_iso_utc(start_date)
+            end_ts = _parse_iso_utc(end_date)
+            days_diff = (end_ts - start_ts) // SECONDS_PER_DAY
 
         except (ValueError, AttributeError) as e:
             # Log invalid date format error
-            logger.error(f"Invalid date format - start_date: {start_date}, end_date: {end_date}")
+            logger.error("Invalid date format - start_date: %s, end_date: %s", start_date, end_date)
             _log_error_details(
                 logger_instance=logger,
                 error_type="InvalidDateFormatError",
@@ -477,47 +828,103 @@ class PayPalClient:
                     "transaction_status": transaction_status,
                     "expected_format": "ISO 8601 (YYYY-MM-DDTHH:MM:SSZ)",
                 },
+                capture_traceback=True,
             )
-            raise ValueError(
+            raise InvalidDateRangeError(
                 f"Invalid date format. Expected ISO 8601 (e.g., '2025-12-29T21:00:00Z'). "
                 f"Got start_date={start_date}, end_date={end_date}"
             ) from e
 
         if days_diff <= MAX_DATE_RANGE_DAYS:
             # Single request sufficient
-            logger.info(f"Date range is {days_diff} days, single request")
+            logger.info("Date range is %d days, single request", days_diff)
             return await self._get_transactions_chunk(
                 start_date, end_date, page, page_size, transaction_status
             )
 
         # Split into chunks and make parallel requests
-        logger.info(f"Date range is {days_diff} days, splitting into chunks")
-        date_ranges = self._split_date_range(start_date, end_date)
-
-        # Limit concurrent requests
-        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
-
-        async def fetch_with_semaphore(rng: Tuple[str, str]) -> Dict[str, Any]:
-            async with semaphore:
-                return await self._get_transactions_chunk(
-                    rng[0], rng[1], page, page_size, transaction_status
-                )
-
-        # Fetch all chunks in parallel
-        logger.info(f"Fetching {len(date_ranges)} chunks with max {MAX_CONCURRENT_REQUESTS} concurrent")
+        logger.info("Date range is %d days, splitting into chunks", days_diff)
+        date_ranges = self._split_date_range_parsed(start_ts, end_ts)
+
+        # Bounded worker pool: task count stays at the concurrency limit rather
+        # than one task per request. pages[chunk][i] holds the i-th page fetched
+        # for a chunk, so merge order never depends on completion order.
+        pages: List[List[Optional[Dict[str, Any]]]] = [[None] for _ in date_ranges]
+        queue: "asyncio.Queue[Tuple[int, int, int]]" = asyncio.Queue()
+        # Always start at page 1: a merged result can't be paged meaningfully.
+        # Requests over the budget are skipped (oldest chunks first) rather
+        # than failing the whole query.
+        queued = min(len(date_ranges), MAX_PAGES_PER_SPLIT_QUERY)
+        truncated = queued < len(date_ranges)
+        for chunk_index in range(queued):
+            queue.put_nowait((chunk_index, 0, 1))
+
+        async def worker() -> None:
+            nonlocal queued, truncated
+            while True:
+                chunk_index, page_index, page_number = await queue.get()
+                try:
+                    chunk_start, chunk_end = date_ranges[chunk_index]
+                    # Limit concurrent requests across all callers
+                    async with self._admit:
+                        result = await self._get_transactions_chunk(
+                            chunk_start,
+                            chunk_end,
+                            page_number,
+                            SPLIT_QUERY_PAGE_SIZE,
+                            transaction_status,
+                        )
+                    pages[chunk_index][page_index] = result
+
+                    # First page of a chunk: queue as many of its remaining
+                    # pages as the budget allows
+                    if page_index == 0 and result:
+                        remaining = (result.get("total_pages") or 1) - 1
+                        extra = min(remaining, MAX_PAGES_PER_SPLIT_QUERY - queued)
+                        if extra < remaining:
+                            truncated = True
+                        queued += extra
+                        chunk_pages = pages[chunk_index]
+                        for number in range(2, extra + 2):
+                            chunk_pages.append(None)
+                            queue.put_nowait((chunk_index, len(chunk_pages) - 1, number))
+                finally:
+                    queue.task_done()
+
+        # No more workers than chunks: extra ones would only idle until cancelled
+        workers = min(self._admit.limit, len(date_ranges))
+        logger.info("Fetching %d chunks with %d workers", len(date_ranges), workers)
 
         try:
-            results = await asyncio.gather(*[fetch_with_semaphore(rng) for rng in date_ranges])
-
-            # Merge results
-            all_transactions = []
-            total_items = 0
-
-            for i, result in enumerate(results):
-                if result and "transaction_details" in result:
-                    all_transactions.extend(result["transaction_details"])
-                if result and "total_items" in result:
-                    total_items += result.get("total_items", 0)
+            # TaskGroup cancels the remaining workers as soon as one fails, so a
+            # 4xx doesn't keep burning requests through the admission controller
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    worker_tasks = [tg.create_task(worker()) for _ in range(workers)]
+                    # Workers may enqueue more pages, so wait for the queue to drain
+                    await queue.join()
+                    for task in worker_tasks:
+                        task.cancel()
+            except ExceptionGroup as eg:
+                # Surface the first chunk failure itself; callers handle httpx errors
+                raise eg.exceptions[0] from None
+
+            # Merge results (single C-level flatten, no incremental list growth)
+            all_transactions = list(
+                chain.from_iterable(
+                    r.get("transaction_details") or () for chunk in pages for r in chunk if r
+                )
+            )
+            # total_items is per date range, so count it from each chunk's first page
+            total_items = sum(chunk[0].get("total_items", 0) for chunk in pages if chunk[0])
+
+            if truncated:
+                logger.warning(
+                    "Split query truncated at %d PayPal requests (%d of %d transactions)",
+                    MAX_PAGES_PER_SPLIT_QUERY,
+                    len(all_transactions),
+                    total_items,
+                )
 
             merged_response = {
                 "transaction_details": all_transactions,
@@ -525,15 +932,18 @@ class PayPalClient:
                 "total_pages": 1,  # Merged result, pagination info not meaningful
                 "_chunks": len(date_ranges),  # Metadata: number of chunks merged
                 "_date_range_days": days_diff,  # Metadata: original date range in days
+                "_truncated": truncated,  # Metadata: request budget cut the result short
             }
 
-            logger.info(f"Merged {len(date_ranges)} chunks: {len(all_transactions)} transactions total")
+            logger.info(
+                "Merged %d chunks: %d transactions total", len(date_ranges), len(all_transactions)
+            )
 
             return merged_response
 
         except Exception as e:
             # Log error during parallel chunk fetching
-            logger.error(f"Error during parallel chunk fetching: {e}")
+            logger.error("Error during parallel chunk fetching: %s", e)
             _log_error_details(
                 logger_instance=logger,
                 error_type="ParallelFetchError",
@@ -552,9 +962,17 @@ class PayPalClient:
                     "days_diff": days_diff,
                     "transaction_status": transaction_status,
                 },
+                capture_traceback=True,
             )
             raise
 
 
-# Singleton instance for use across the app
-paypal_client = PayPalClient()
+@lru_cache(maxsize=1)
+def get_paypal_client() -> PayPalClient:
+    """
+    Shared PayPalClient for the app, built on first use.
+
+    Deferring construction keeps plain imports of this module from creating
+    an httpx client (and its SSL context).
+    """
+    return PayPalClient()
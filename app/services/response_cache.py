@@ -0,0 +1,35 @@
+"""Short-lived cache of fully processed API responses."""
+
+from typing import Any, Hashable, Optional, Tuple
+
+from cachetools import TTLCache
+
+from app.config import settings
+
+# Serialized JSON bodies keyed by (endpoint, sorted query params).
+# Dashboards poll the same queries repeatedly; a hit skips the PayPal call,
+# USD conversion, snake_case normalization and JSON encoding entirely.
+response_cache: TTLCache = TTLCache(
+    maxsize=256,
+    ttl=settings.response_cache_ttl_seconds,
+)
+
+
+def make_cache_key(endpoint: str, **params: Any) -> Tuple[Hashable, ...]:
+    """Build a response cache key from an endpoint name and its query params."""
+    return (endpoint, tuple(sorted(params.items())))
+
+
+def clear_cache(endpoint: Optional[str] = None) -> None:
+    """
+    Drop cached responses.
+
+    Args:
+        endpoint: Only drop entries for this endpoint, e.g. "balance"
+            (default: drop everything)
+    """
+    if endpoint is None:
+        response_cache.clear()
+        return
+    for key in [k for k in list(response_cache.keys()) if k[0] == endpoint]:
+        response_cache.pop(key, None)
@@ -0,0 +1,57 @@
+"""Key case conversion for PayPal JSON payloads."""
+
+import re
+from functools import lru_cache
+from typing import Any, Collection, Dict, List, Union
+
+# camelCase word boundary (any uppercase letter not at the start)
+_CAMEL_RE = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+@lru_cache(maxsize=512)
+def _snake(key: str) -> str:
+    """Convert a single camelCase key to snake_case (memoized per key)."""
+    # Most PayPal reporting keys are already snake_case
+    if key.islower():
+        return key
+    return _CAMEL_RE.sub("_", key).lower()
+
+
+def to_snake_case(
+    data: Union[Dict[str, Any], List[Any]],
+    skip: Collection[str] = (),
+) -> Union[Dict[str, Any], List[Any]]:
+    """
+    Convert camelCase keys to snake_case recursively, in place.
+
+    PayPal uses camelCase; we normalize to snake_case for consistency.
+    Dicts and lists are mutated rather than rebuilt, so the response tree
+    is never copied. Returns the same object for convenience.
+
+    Args:
+        data: Dict or list to normalize
+        skip: Top-level keys whose values are already normalized and
+            should not be walked again
+    """
+    stack = [data]
+
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            # Only rebuild dicts that actually have camelCase keys (keeps key order)
+            if any(_snake(k) != k for k in node):
+                items = list(node.items())
+                node.clear()
+                node.update((_snake(k), v) for k, v in items)
+            if skip and node is data:
+                values = [v for k, v in node.items() if k not in skip]
+            else:
+                values = node.values()
+        elif isinstance(node, list):
+            values = node
+        else:
+            continue
+
+        stack.extend(v for v in values if isinstance(v, (dict, list)))
+
+    return data
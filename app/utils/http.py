@@ -0,0 +1,16 @@
+"""Helpers for working with httpx response bodies as bytes."""
+
+import httpx
+
+# Bodies are truncated to this many bytes before decoding for logs
+MAX_LOGGED_BODY_BYTES = 4096
+
+
+def body_text(response: httpx.Response, limit: int = MAX_LOGGED_BODY_BYTES) -> str:
+    """
+    Decode a (truncated) response body for logging.
+
+    Upstream APIs always send UTF-8 JSON, so this skips httpx's charset
+    detection in response.text and replaces any invalid bytes.
+    """
+    return response.content[:limit].decode("utf-8", "replace")
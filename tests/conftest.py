@@ -1,9 +1,79 @@
 """Pytest configuration and fixtures."""
 
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import orjson
 import pytest
 from httpx import ASGITransport, AsyncClient
 
 from app.main import app
+from app.services.paypal_client import PayPalClient
+from app.services.rate_limiter import limiter
+from app.services.response_cache import response_cache
+
+TOKEN_PATH = "/v1/oauth2/token"
+
+
+def json_response(
+    payload: Any = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> httpx.Response:
+    """Build a PayPal-style JSON response for MockPayPalAPI handlers."""
+    content = orjson.dumps(payload) if payload is not None else b""
+    return httpx.Response(status_code, content=content, headers=headers)
+
+
+class MockPayPalAPI:
+    """
+    In-memory PayPal API served through httpx.MockTransport.
+
+    Handlers are registered per URL path and receive the httpx.Request; they
+    may be sync or async. Every request is recorded in `calls`.
+    """
+
+    def __init__(self) -> None:
+        self.calls: List[httpx.Request] = []
+        self._routes: Dict[str, Callable[[httpx.Request], Any]] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget recorded calls and routes; serve a valid token by default."""
+        self.calls.clear()
+        self._routes.clear()
+        self.json(TOKEN_PATH, {"access_token": "test-token", "expires_in": 3600})
+
+    def route(self, path: str, handler: Callable[[httpx.Request], Any]) -> None:
+        """Serve path with handler(request) -> httpx.Response (or awaitable)."""
+        self._routes[path] = handler
+
+    def json(self, path: str, payload: Any, status_code: int = 200) -> None:
+        """Serve path with the same JSON payload on every call."""
+        self.route(path, lambda request: json_response(payload, status_code))
+
+    def sequence(self, path: str, *responses: httpx.Response) -> None:
+        """Serve path with the given responses, one per call, in order."""
+        pending = list(responses)
+        self.route(path, lambda request: pending.pop(0))
+
+    def count(self, path: str) -> int:
+        """Number of requests made to path."""
+        return sum(1 for request in self.calls if request.url.path == path)
+
+    def __call__(self, request: httpx.Request) -> Any:
+        self.calls.append(request)
+        return self._routes[request.url.path](request)
+
+
+@pytest.fixture(autouse=True)
+def reset_app_state():
+    """Start every test with an empty response cache and fresh rate limits."""
+    response_cache.clear()
+    limiter.reset()
+    yield
+    response_cache.clear()
 
 
 @pytest.fixture
@@ -12,3 +82,30 @@ async def async_client():
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as client:
         yield client
+
+
+@pytest.fixture(scope="session")
+def mock_paypal_api():
+    """Single in-memory PayPal API shared by the whole session."""
+    return MockPayPalAPI()
+
+
+@pytest.fixture(scope="session")
+def paypal_http(mock_paypal_api):
+    """Single MockTransport-backed httpx client shared by the whole session."""
+    client = AsyncClient(transport=httpx.MockTransport(mock_paypal_api))
+    yield client
+    asyncio.run(client.aclose())
+
+
+@pytest.fixture
+def paypal_api(mock_paypal_api):
+    """The mock PayPal API, reset to defaults for this test."""
+    mock_paypal_api.reset()
+    return mock_paypal_api
+
+
+@pytest.fixture
+def paypal(paypal_http, paypal_api):
+    """PayPalClient with fresh caches, reusing the session's mock httpx client."""
+    return PayPalClient(client=paypal_http)
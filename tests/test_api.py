@@ -15,7 +15,7 @@ async def test_health_endpoint(async_client):
 
 
 @pytest.mark.asyncio
-@patch("app.api.v1.paypal.paypal_client.get_balances")
+@patch("app.services.paypal_client.PayPalClient.get_balances")
 async def test_get_balance_success(mock_get_balances, async_client):
     """GET /balance should return PayPal data with snake_case keys."""
     mock_get_balances.return_value = {
@@ -32,7 +32,25 @@ async def test_get_balance_success(mock_get_balances, async_client):
 
 
 @pytest.mark.asyncio
-@patch("app.api.v1.paypal.paypal_client.get_transactions")
+@patch("app.services.paypal_client.PayPalClient.get_balances")
+async def test_get_balance_nested_snake_case(mock_get_balances, async_client):
+    """Nested dicts and lists should have their keys converted too."""
+    mock_get_balances.return_value = {
+        "balances": [{"totalBalance": {"currencyCode": "USD"}, "linkedAccounts": [{"accountId": "A"}]}],
+        "asOfTime": "2024-01-01T00:00:00Z",
+    }
+
+    response = await async_client.get("/api/v1/paypal/balance", params={"convert_to_usd": False})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "balances": [{"total_balance": {"currency_code": "USD"}, "linked_accounts": [{"account_id": "A"}]}],
+        "as_of_time": "2024-01-01T00:00:00Z",
+    }
+
+
+@pytest.mark.asyncio
+@patch("app.services.paypal_client.PayPalClient.get_transactions")
 async def test_get_transactions_success(mock_get_transactions, async_client):
     """GET /transactions should forward query params to PayPal."""
     mock_get_transactions.return_value = {
@@ -64,7 +82,7 @@ async def test_get_transactions_success(mock_get_transactions, async_client):
 
 
 @pytest.mark.asyncio
-@patch("app.api.v1.paypal.paypal_client.get_transactions")
+@patch("app.services.paypal_client.PayPalClient.get_transactions")
 async def test_get_transactions_with_status_filter(mock_get_transactions, async_client):
     """GET /transactions should pass transaction_status param to PayPal."""
     mock_get_transactions.return_value = {"transaction_details": [], "total_items": 0}
@@ -86,7 +104,7 @@ async def test_get_transactions_with_status_filter(mock_get_transactions, async_
 
 
 @pytest.mark.asyncio
-@patch("app.api.v1.paypal.paypal_client.get_balances")
+@patch("app.services.paypal_client.PayPalClient.get_balances")
 async def test_rate_limiting(mock_get_balances, async_client):
     """Requests exceeding 60/minute should return 429."""
     mock_get_balances.return_value = {"balances": []}
@@ -97,3 +115,219 @@ async def test_rate_limiting(mock_get_balances, async_client):
 
     rate_limited = [r for r in responses if r.status_code == status.HTTP_429_TOO_MANY_REQUESTS]
     assert len(rate_limited) > 0, "Expected some requests to be rate limited"
+
+
+@pytest.mark.asyncio
+@patch("app.api.v1.paypal.exchange_rate_service._fetch_rate_from_api")
+@patch("app.services.paypal_client.PayPalClient.get_transactions")
+async def test_get_transactions_usd_conversion(mock_get_transactions, mock_fetch_rate, async_client):
+    """GET /transactions should add value_usd for each transaction amount."""
+    from decimal import Decimal
+
+    from app.services.exchange_rate_service import exchange_rate_service
+
+    exchange_rate_service.clear_cache()
+    mock_fetch_rate.return_value = Decimal("1.5")
+    mock_get_transactions.return_value = {
+        "transaction_details": [
+            {"transaction_info": {"transaction_amount": {"value": "10.00", "currency_code": "EUR"}}},
+            {"transaction_info": {"transaction_amount": {"value": "-4.00", "currency_code": "EUR"}}},
+            {"transaction_info": {"transaction_amount": {"value": "2.50", "currency_code": "USD"}}},
+        ],
+        "total_items": 3,
+    }
+
+    response = await async_client.get(
+        "/api/v1/paypal/transactions",
+        params={"start_date": "2024-01-01T00:00:00Z", "end_date": "2024-01-31T23:59:59Z"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    amounts = [
+        tx["transaction_info"]["transaction_amount"]
+        for tx in response.json()["transaction_details"]
+    ]
+    assert [a["value_usd"] for a in amounts] == [15.0, -6.0, 2.5]
+    assert [a["original_currency"] for a in amounts] == ["EUR", "EUR", "USD"]
+
+
+@pytest.mark.asyncio
+@patch("app.api.v1.paypal.exchange_rate_service._fetch_rate_from_api")
+@patch("app.services.paypal_client.PayPalClient.get_transactions")
+async def test_get_transactions_null_currency_code(mock_get_transactions, mock_fetch_rate, async_client):
+    """A null currency_code should only leave that row unconverted, not fail the request."""
+    from decimal import Decimal
+
+    from app.services.exchange_rate_service import exchange_rate_service
+
+    exchange_rate_service.clear_cache()
+    mock_fetch_rate.return_value = Decimal("1.5")
+    mock_get_transactions.return_value = {
+        "transaction_details": [
+            {"transaction_info": {"transaction_amount": {"value": "10.00", "currency_code": None}}},
+            {"transaction_info": {"transaction_amount": {"value": "10.00", "currency_code": "EUR"}}},
+        ],
+        "total_items": 2,
+    }
+
+    response = await async_client.get(
+        "/api/v1/paypal/transactions",
+        params={"start_date": "2024-01-01T00:00:00Z", "end_date": "2024-01-31T23:59:59Z"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    amounts = [
+        tx["transaction_info"]["transaction_amount"]
+        for tx in response.json()["transaction_details"]
+    ]
+    assert amounts[0]["value_usd"] is None
+    assert amounts[1]["value_usd"] == 15.0
+
+
+@pytest.mark.asyncio
+@patch("app.services.paypal_client.PayPalClient.get_transactions")
+async def test_get_transactions_masks_transaction_ids(mock_get_transactions, async_client):
+    """Transaction IDs should have their last 5 characters masked."""
+    mock_get_transactions.return_value = {
+        "transaction_details": [
+            {"transaction_info": {"transaction_id": "ABC123DEF456GHI789"}, "transaction_id": "XYZ98765"},
+            {"transaction_info": {"transaction_id": "SHORT"}},
+        ],
+        "total_items": 2,
+    }
+
+    response = await async_client.get(
+        "/api/v1/paypal/transactions",
+        params={
+            "start_date": "2024-01-01T00:00:00Z",
+            "end_date": "2024-01-31T23:59:59Z",
+            "convert_to_usd": False,
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    details = response.json()["transaction_details"]
+    assert details[0]["transaction_info"]["transaction_id"] == "ABC123DEF456G*****"
+    assert details[0]["transaction_id"] == "XYZ*****"
+    assert details[1]["transaction_info"]["transaction_id"] == "SHORT"
+
+
+@pytest.mark.asyncio
+@patch("app.services.paypal_client.PayPalClient.get_balances")
+async def test_get_balance_served_from_response_cache(mock_get_balances, async_client):
+    """Identical /balance queries within the TTL should not call PayPal again."""
+    mock_get_balances.return_value = {"balances": [{"availableAmount": "1.00"}]}
+
+    first = await async_client.get("/api/v1/paypal/balance", params={"convert_to_usd": False})
+    second = await async_client.get("/api/v1/paypal/balance", params={"convert_to_usd": False})
+
+    assert first.json() == second.json()
+    mock_get_balances.assert_called_once()
+
+
+
+@pytest.mark.asyncio
+@patch("app.api.v1.paypal.exchange_rate_service._fetch_rate_from_api")
+@patch("app.services.paypal_client.PayPalClient.get_balances")
+async def test_get_balance_failed_conversion_not_cached(mock_get_balances, mock_fetch_rate, async_client):
+    """A balance whose USD conversion failed should not be cached."""
+    from app.services.exchange_rate_service import exchange_rate_service
+
+    exchange_rate_service.clear_cache()
+    mock_fetch_rate.side_effect = ValueError("rate service down")
+    mock_get_balances.return_value = {
+        "balances": [{"total_balance": {"value": "10.00", "currency_code": "EUR"}}]
+    }
+
+    first = await async_client.get("/api/v1/paypal/balance")
+    await async_client.get("/api/v1/paypal/balance")
+
+    assert "_usd_conversion_enabled" not in first.json()
+    assert mock_get_balances.call_count == 2
+
+
+@pytest.mark.asyncio
+@patch("app.api.v1.paypal.exchange_rate_service._fetch_rate_from_api")
+@patch("app.services.paypal_client.PayPalClient.get_transactions")
+async def test_get_transactions_failed_conversion_not_cached(
+    mock_get_transactions, mock_fetch_rate, async_client
+):
+    """Transactions left with value_usd=None should not be cached."""
+    from decimal import Decimal
+
+    from app.services.exchange_rate_service import exchange_rate_service
+
+    exchange_rate_service.clear_cache()
+    mock_fetch_rate.side_effect = [ValueError("rate service down"), Decimal("1.5")]
+    mock_get_transactions.return_value = {
+        "transaction_details": [
+            {"transaction_info": {"transaction_amount": {"value": "10.00", "currency_code": "EUR"}}},
+        ],
+    }
+    params = {"start_date": "2024-01-01T00:00:00Z", "end_date": "2024-01-31T23:59:59Z"}
+
+    def value_usd(response):
+        tx = response.json()["transaction_details"][0]
+        return tx["transaction_info"]["transaction_amount"]["value_usd"]
+
+    assert value_usd(await async_client.get("/api/v1/paypal/transactions", params=params)) is None
+    assert value_usd(await async_client.get("/api/v1/paypal/transactions", params=params)) == 15.0
+    # Only the fully converted response was cached
+    assert value_usd(await async_client.get("/api/v1/paypal/transactions", params=params)) == 15.0
+    assert mock_get_transactions.call_count == 2
+
+
+@pytest.mark.asyncio
+@patch("app.services.paypal_client.PayPalClient.get_balances")
+async def test_clear_cache_invalidates_endpoint(mock_get_balances, async_client):
+    """clear_cache(endpoint) should force the next query to call PayPal again."""
+    from app.services.response_cache import clear_cache
+
+    mock_get_balances.return_value = {"balances": []}
+    params = {"convert_to_usd": False}
+
+    await async_client.get("/api/v1/paypal/balance", params=params)
+    clear_cache("transactions")
+    await async_client.get("/api/v1/paypal/balance", params=params)
+    assert mock_get_balances.call_count == 1
+
+    clear_cache("balance")
+    await async_client.get("/api/v1/paypal/balance", params=params)
+    assert mock_get_balances.call_count == 2
+
+
+@pytest.mark.asyncio
+@patch("app.services.paypal_client.PayPalClient.get_transactions")
+async def test_get_transactions_invalid_request_returns_400(mock_get_transactions, async_client):
+    """InvalidDateRangeError from the client should map to 400."""
+    from app.services.paypal_client import InvalidDateRangeError
+
+    mock_get_transactions.side_effect = InvalidDateRangeError("Invalid date format")
+
+    response = await async_client.get(
+        "/api/v1/paypal/transactions",
+        params={"start_date": "bad", "end_date": "2024-01-31T23:59:59Z"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "invalid_request"
+
+
+@pytest.mark.asyncio
+@patch("app.services.paypal_client.PayPalClient.get_transactions")
+async def test_get_transactions_malformed_upstream_body_returns_502(mock_get_transactions, async_client):
+    """A PayPal body that fails to decode is an upstream fault, not a bad request."""
+    import orjson
+
+    def malformed_body(**kwargs):
+        return orjson.loads(b"<html>")
+
+    mock_get_transactions.side_effect = malformed_body
+
+    response = await async_client.get(
+        "/api/v1/paypal/transactions",
+        params={"start_date": "2024-01-01T00:00:00Z", "end_date": "2024-01-31T23:59:59Z"},
+    )
+
+    assert response.status_code == 502
+    assert response.json()["detail"]["error"] == "bad_gateway"
@@ -0,0 +1,35 @@
+"""Key case conversion tests."""
+
+from app.utils.case import to_snake_case
+
+
+def test_to_snake_case_nested():
+    """camelCase keys should be converted at every level, including inside lists."""
+    data = {"totalItems": 1, "transactionDetails": [{"payerInfo": {"accountId": "A"}}, [{"emailAddress": "x"}]]}
+
+    assert to_snake_case(data) == {
+        "total_items": 1,
+        "transaction_details": [{"payer_info": {"account_id": "A"}}, [{"email_address": "x"}]],
+    }
+
+
+def test_to_snake_case_in_place_preserves_order():
+    """Conversion should mutate the given objects and keep key order."""
+    inner = {"aB": 1}
+    data = {"first": inner, "secondKey": 2, "third": 3}
+
+    result = to_snake_case(data)
+
+    assert result is data
+    assert data["first"] is inner
+    assert list(data) == ["first", "second_key", "third"]
+    assert inner == {"a_b": 1}
+
+
+def test_to_snake_case_skip_top_level_key():
+    """Values under skipped top-level keys should not be walked."""
+    data = {"transaction_details": [{"keepMe": 1}], "totalItems": 1}
+
+    to_snake_case(data, skip=("transaction_details",))
+
+    assert data == {"transaction_details": [{"keepMe": 1}], "total_items": 1}
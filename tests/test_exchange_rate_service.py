@@ -0,0 +1,138 @@
+"""Exchange rate service tests."""
+
+import asyncio
+from decimal import Decimal
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.services.exchange_rate_service import ExchangeRateService
+
+
+@pytest.fixture
+async def service():
+    """ExchangeRateService with an empty rate cache."""
+    svc = ExchangeRateService()
+    yield svc
+    await svc.close()
+
+
+async def _use_transport(service, handler):
+    """Swap the service's HTTP client for one backed by a MockTransport handler."""
+    await service._client.aclose()
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_fetch_once(service):
+    """Concurrent cache misses for one currency should share a single API call."""
+
+    async def slow_rate(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return Decimal("1.1")
+
+    with patch.object(service, "_fetch_rate_from_api", side_effect=slow_rate) as mock_fetch:
+        rates = await asyncio.gather(*[service.get_rate_to_usd("eur") for _ in range(5)])
+
+    assert rates == [Decimal("1.1")] * 5
+    assert mock_fetch.call_count == 1
+    # Cached afterwards
+    assert await service.get_rate_to_usd("EUR") == Decimal("1.1")
+
+
+@pytest.mark.asyncio
+async def test_cancelled_joiner_does_not_break_owner(service):
+    """Cancelling a caller joined to an in-flight fetch must not fail the owner or later callers."""
+    release = asyncio.Event()
+
+    async def held_rate(*args, **kwargs):
+        await release.wait()
+        return Decimal("1.1")
+
+    with patch.object(service, "_fetch_rate_from_api", side_effect=held_rate) as mock_fetch:
+        owner = asyncio.create_task(service.get_rate_to_usd("EUR"))
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(service.get_rate_to_usd("EUR"))
+        await asyncio.sleep(0)
+
+        joiner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await joiner
+
+        # A caller arriving after the cancellation still joins the live fetch
+        late = asyncio.create_task(service.get_rates_to_usd({"EUR"}))
+        await asyncio.sleep(0)
+
+        release.set()
+        assert await owner == Decimal("1.1")
+        assert await late == {"USD": Decimal("1.0"), "EUR": Decimal("1.1")}
+        assert mock_fetch.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_warm_cache_stores_inverted_rates(service):
+    """warm_cache should fetch USD-based rates once and cache their inverses."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"base": "USD", "rates": {"eur": 0.8, "GBP": 0.5, "XXX": 0}})
+
+    await _use_transport(service, handler)
+    await service.warm_cache()
+
+    assert len(requests) == 1
+    assert requests[0].url.path == "/latest"
+    assert requests[0].url.params["from"] == "USD"
+    assert service._rate_cache["EUR"] == Decimal("1.25")
+    assert service._rate_cache["GBP"] == Decimal("2")
+    # Zero rates cannot be inverted and are skipped
+    assert "XXX" not in service._rate_cache
+
+    with patch.object(service, "_fetch_rate_from_api") as mock_fetch:
+        assert await service.get_rate_to_usd("EUR") == Decimal("1.25")
+    mock_fetch.assert_not_called()
+
+
+def _raise_connect_error(request):
+    raise httpx.ConnectError("connection refused", request=request)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "handler",
+    [
+        lambda request: httpx.Response(500, text="upstream down"),
+        lambda request: httpx.Response(200, content=b"not json"),
+        _raise_connect_error,
+        lambda request: httpx.Response(200, json=[{"EUR": 0.8}]),
+        lambda request: httpx.Response(200, json={"rates": None}),
+        lambda request: httpx.Response(200, json={"rates": {"EUR": "abc"}}),
+    ],
+    ids=["http-error", "bad-json", "network-error", "list-body", "null-rates", "bad-rate"],
+)
+async def test_warm_cache_failure_is_logged_and_ignored(service, handler, caplog):
+    """A failed warm-up should log a warning, leave the cache empty and not raise."""
+    await _use_transport(service, handler)
+
+    with caplog.at_level("WARNING", logger="app.services.exchange_rate_service"):
+        await service.warm_cache()
+
+    assert len(service._rate_cache) == 0
+    assert "Failed to warm exchange rate cache" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_warm_cache_skips_invalid_rates(service):
+    """Rates that can't be converted should be skipped without dropping the valid ones."""
+
+    def handler(request):
+        return httpx.Response(
+            200, json={"rates": {"EUR": "abc", "GBP": [0.5], "JPY": "-", "CAD": 0.5}}
+        )
+
+    await _use_transport(service, handler)
+    await service.warm_cache()
+
+    assert dict(service._rate_cache) == {"CAD": Decimal("2")}
@@ -1,29 +1,30 @@
 """PayPal client service tests."""
 
+import asyncio
 from unittest.mock import AsyncMock, patch
 
 import httpx
 import pytest
 
+from tests.conftest import json_response
 
-def test_split_date_range_single_chunk():
-    """Date range <= 31 days should return single chunk."""
-    from app.services.paypal_client import PayPalClient
+BALANCES_PATH = "/v1/reporting/balances"
+TOKEN_PATH = "/v1/oauth2/token"
+TRANSACTIONS_PATH = "/v1/reporting/transactions"
 
-    client = PayPalClient()
-    ranges = client._split_date_range("2024-01-01T00:00:00Z", "2024-01-31T23:59:59Z")
+
+def test_split_date_range_single_chunk(paypal):
+    """Date range <= 31 days should return single chunk."""
+    ranges = paypal._split_date_range("2024-01-01T00:00:00Z", "2024-01-31T23:59:59Z")
 
     assert len(ranges) == 1
     assert ranges[0][0] == "2024-01-01T00:00:00Z"
     assert "2024-01-31" in ranges[0][1]
 
 
-def test_split_date_range_multiple_chunks():
+def test_split_date_range_multiple_chunks(paypal):
     """Date range > 31 days should split into multiple chunks."""
-    from app.services.paypal_client import PayPalClient
-
-    client = PayPalClient()
-    ranges = client._split_date_range("2024-01-01T00:00:00Z", "2024-03-15T23:59:59Z")
+    ranges = paypal._split_date_range("2024-01-01T00:00:00Z", "2024-03-15T23:59:59Z")
 
     # Jan 1 to Mar 15 = ~74 days, should be 3 chunks
     assert len(ranges) == 3
@@ -34,47 +35,26 @@ def test_split_date_range_multiple_chunks():
     assert "2024-02-01" in ranges[0][1]
 
 
-def test_split_date_range_exact_31_days():
+def test_split_date_range_exact_31_days(paypal):
     """Exactly 31 days should be single chunk."""
-    from app.services.paypal_client import PayPalClient
-
-    client = PayPalClient()
-    ranges = client._split_date_range("2024-01-01T00:00:00Z", "2024-02-01T00:00:00Z")
+    ranges = paypal._split_date_range("2024-01-01T00:00:00Z", "2024-02-01T00:00:00Z")
 
     assert len(ranges) == 1
 
 
-def test_split_date_range_100_days():
+def test_split_date_range_100_days(paypal):
     """100 days should split into 4 chunks (31+31+31+7)."""
-    from app.services.paypal_client import PayPalClient
-
-    client = PayPalClient()
-    ranges = client._split_date_range("2024-01-01T00:00:00Z", "2024-04-10T00:00:00Z")
+    ranges = paypal._split_date_range("2024-01-01T00:00:00Z", "2024-04-10T00:00:00Z")
 
     assert len(ranges) == 4
 
 
 @pytest.mark.asyncio
-@patch("httpx.AsyncClient.post")
-@patch("httpx.AsyncClient.request")
-async def test_get_transactions_single_range(mock_request, mock_post):
+async def test_get_transactions_single_range(paypal, paypal_api):
     """Transactions <= 31 days should make single request."""
-    from app.services.paypal_client import PayPalClient
-
-    mock_post.return_value = AsyncMock(
-        status_code=200,
-        json=lambda: {"access_token": "test-token", "expires_in": 3600},
-        raise_for_status=lambda: None,
-    )
+    paypal_api.json(TRANSACTIONS_PATH, {"transaction_details": [{"id": "TX1"}], "total_items": 1})
 
-    mock_request.return_value = AsyncMock(
-        status_code=200,
-        json=lambda: {"transaction_details": [{"id": "TX1"}], "total_items": 1},
-        raise_for_status=lambda: None,
-    )
-
-    client = PayPalClient()
-    result = await client.get_transactions(
+    result = await paypal.get_transactions(
         "2024-01-01T00:00:00Z",
         "2024-01-15T00:00:00Z"
     )
@@ -82,32 +62,16 @@ async def test_get_transactions_single_range(mock_request, mock_post):
     assert "transaction_details" in result
     assert len(result["transaction_details"]) == 1
     assert "_chunks" not in result  # No metadata for single request
-
-    await client.close()
+    assert paypal_api.count(TRANSACTIONS_PATH) == 1
 
 
 @pytest.mark.asyncio
-@patch("httpx.AsyncClient.post")
-@patch("httpx.AsyncClient.request")
-async def test_get_transactions_split_and_merge(mock_request, mock_post):
+async def test_get_transactions_split_and_merge(paypal, paypal_api):
     """Transactions > 31 days should split, parallel fetch, and merge."""
-    from app.services.paypal_client import PayPalClient
+    # Same response for both chunks
+    paypal_api.json(TRANSACTIONS_PATH, {"transaction_details": [{"id": "TX1"}], "total_items": 1})
 
-    mock_post.return_value = AsyncMock(
-        status_code=200,
-        json=lambda: {"access_token": "test-token", "expires_in": 3600},
-        raise_for_status=lambda: None,
-    )
-
-    # Mock responses for 2 chunks
-    mock_request.return_value = AsyncMock(
-        status_code=200,
-        json=lambda: {"transaction_details": [{"id": "TX1"}], "total_items": 1},
-        raise_for_status=lambda: None,
-    )
-
-    client = PayPalClient()
-    result = await client.get_transactions(
+    result = await paypal.get_transactions(
         "2024-01-01T00:00:00Z",
         "2024-02-20T00:00:00Z"  # 50 days = 2 chunks
     )
@@ -117,128 +81,408 @@ async def test_get_transactions_split_and_merge(mock_request, mock_post):
     assert result["_chunks"] == 2
     assert result["_date_range_days"] == 50
 
-    await client.close()
 
+@pytest.mark.asyncio
+async def test_get_transactions_split_workers_capped_by_chunks(paypal, paypal_api, caplog):
+    """The worker pool should not outnumber the chunks to fetch."""
+    paypal_api.json(TRANSACTIONS_PATH, {"transaction_details": [], "total_items": 0})
+    await paypal.set_concurrency(8)
+
+    with caplog.at_level("INFO", logger="app.services.paypal_client"):
+        # 50 days = 2 chunks
+        await paypal.get_transactions("2024-01-01T00:00:00Z", "2024-02-20T00:00:00Z")
+
+    assert "Fetching 2 chunks with 2 workers" in caplog.text
 
 
 @pytest.mark.asyncio
-@patch("httpx.AsyncClient.post")
-async def test_token_caching(mock_post):
-    """Token should be cached and reused until expiry."""
-    from app.services.paypal_client import PayPalClient
+async def test_get_transactions_merge_preserves_chunk_order(paypal, paypal_api):
+    """Merged transactions should follow chunk order even if chunks finish out of order."""
+
+    async def chunk_response(request):
+        start = request.url.params["start_date"]
+        # Earlier chunks answer slower
+        await asyncio.sleep(0.02 if start.startswith("2024-01") else 0)
+        return json_response({"transaction_details": [{"id": start}], "total_items": 1})
+
+    paypal_api.route(TRANSACTIONS_PATH, chunk_response)
+
+    result = await paypal.get_transactions("2024-01-01T00:00:00Z", "2024-04-10T00:00:00Z")
+
+    ids = [tx["id"] for tx in result["transaction_details"]]
+    assert ids == sorted(ids)
+    assert result["_chunks"] == 4
+
+
+@pytest.mark.asyncio
+async def test_get_transactions_split_fetches_all_chunk_pages(paypal, paypal_api):
+    """Split queries should fetch every page of each chunk and merge in date order."""
+
+    async def paged_response(request):
+        start = request.url.params["start_date"][:10]
+        page = int(request.url.params["page"])
+        # Later pages answer faster, so completion order differs from date order
+        await asyncio.sleep(0.01 if page == 1 else 0)
+        return json_response({
+            "transaction_details": [{"id": f"{start}-p{page}"}],
+            "total_items": 2,
+            "total_pages": 2,
+        })
+
+    paypal_api.route(TRANSACTIONS_PATH, paged_response)
+
+    # page only applies to single-range queries; split queries return every page
+    result = await paypal.get_transactions(
+        "2024-01-01T00:00:00Z",
+        "2024-02-20T00:00:00Z",  # 50 days = 2 chunks
+        page=2,
+    )
+
+    assert [tx["id"] for tx in result["transaction_details"]] == [
+        "2024-01-01-p1",
+        "2024-01-01-p2",
+        "2024-02-01-p1",
+        "2024-02-01-p2",
+    ]
+    assert result["total_items"] == 4
+    assert result["_truncated"] is False
+    assert paypal_api.count(TRANSACTIONS_PATH) == 4
+    # Chunks are fetched at the largest page size, not the caller's
+    assert {
+        request.url.params["page_size"]
+        for request in paypal_api.calls
+        if request.url.path == TRANSACTIONS_PATH
+    } == {"500"}
+
 
-    # Mock successful token response
-    mock_post.return_value = AsyncMock(
-        json=lambda: {"access_token": "test-token", "expires_in": 3600},
-        raise_for_status=lambda: None,
+@pytest.mark.asyncio
+async def test_get_transactions_split_truncates_at_page_budget(paypal, paypal_api):
+    """Split queries over MAX_PAGES_PER_SPLIT_QUERY requests should return a flagged partial result."""
+    from app.services.paypal_client import MAX_PAGES_PER_SPLIT_QUERY
+
+    paypal_api.json(
+        TRANSACTIONS_PATH,
+        {"transaction_details": [{"id": "TX"}], "total_items": 50_000, "total_pages": 100},
     )
 
-    client = PayPalClient()
-    token1 = await client._get_access_token()
-    token2 = await client._get_access_token()
+    # 50 days = 2 chunks of 100 pages each
+    result = await paypal.get_transactions("2024-01-01T00:00:00Z", "2024-02-20T00:00:00Z")
+
+    assert paypal_api.count(TRANSACTIONS_PATH) == MAX_PAGES_PER_SPLIT_QUERY
+    assert len(result["transaction_details"]) == MAX_PAGES_PER_SPLIT_QUERY
+    assert result["total_items"] == 100_000
+    assert result["_truncated"] is True
+
+
+@pytest.mark.asyncio
+async def test_get_transactions_split_truncates_long_ranges(paypal, paypal_api):
+    """Ranges with more chunks than the request budget should keep the oldest chunks."""
+    from app.services.paypal_client import MAX_PAGES_PER_SPLIT_QUERY
+
+    paypal_api.json(TRANSACTIONS_PATH, {"transaction_details": [], "total_items": 0})
+
+    # ~5 years > 50 chunks
+    start, end = "2020-01-01T00:00:00Z", "2024-12-31T00:00:00Z"
+    result = await paypal.get_transactions(start, end)
+
+    assert paypal_api.count(TRANSACTIONS_PATH) == MAX_PAGES_PER_SPLIT_QUERY
+    fetched = {
+        request.url.params["start_date"]
+        for request in paypal_api.calls
+        if request.url.path == TRANSACTIONS_PATH
+    }
+    date_ranges = paypal._split_date_range(start, end)
+    assert fetched == {chunk_start for chunk_start, _ in date_ranges[:MAX_PAGES_PER_SPLIT_QUERY]}
+    assert result["_chunks"] == len(date_ranges) > MAX_PAGES_PER_SPLIT_QUERY
+    assert result["_truncated"] is True
+
+
+@pytest.mark.asyncio
+async def test_get_transactions_chunk_failure_aborts_remaining(paypal, paypal_api):
+    """A failing chunk should raise its own error and cancel pending chunks."""
+
+    async def slow_error_response(request):
+        await asyncio.sleep(0.01)
+        return json_response({"name": "INVALID_REQUEST"}, status_code=400)
+
+    paypal_api.route(TRANSACTIONS_PATH, slow_error_response)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        # 100 days -> 4 chunks
+        await paypal.get_transactions("2024-01-01T00:00:00Z", "2024-04-10T00:00:00Z")
+
+    # Only the chunks admitted before the first failure were requested
+    assert paypal_api.count(TRANSACTIONS_PATH) < 4
+
+
+@pytest.mark.asyncio
+async def test_token_caching(paypal, paypal_api):
+    """Token should be cached and reused until expiry."""
+    token1 = await paypal._get_access_token()
+    token2 = await paypal._get_access_token()
 
     assert token1 == token2 == "test-token"
-    assert mock_post.call_count == 1  # Second call uses cache
+    assert paypal_api.count(TOKEN_PATH) == 1  # Second call uses cache
 
-    await client.close()
+
+@pytest.mark.asyncio
+async def test_token_request_uses_basic_auth_form(paypal, paypal_api):
+    """Token request should send Basic credentials and the client_credentials grant."""
+    await paypal._get_access_token()
+
+    request = paypal_api.calls[0]
+    assert request.method == "POST"
+    assert request.headers["authorization"].startswith("Basic ")
+    assert request.headers["content-type"] == "application/x-www-form-urlencoded"
+    assert request.content == b"grant_type=client_credentials"
 
 
 @pytest.mark.asyncio
-@patch("httpx.AsyncClient.post")
-async def test_token_refresh_before_expiry(mock_post):
-    """Token should be refreshed before actual expiry (60s buffer)."""
-    from app.services.paypal_client import PayPalClient
+async def test_concurrent_token_requests_fetch_once(paypal, paypal_api):
+    """Concurrent cache misses should share a single token fetch."""
 
-    mock_post.return_value = AsyncMock(
-        json=lambda: {"access_token": "new-token", "expires_in": 3600},
-        raise_for_status=lambda: None,
-    )
+    async def slow_token_response(request):
+        await asyncio.sleep(0.01)
+        return json_response({"access_token": "test-token", "expires_in": 3600})
+
+    paypal_api.route(TOKEN_PATH, slow_token_response)
+
+    tokens = await asyncio.gather(*[paypal._get_access_token() for _ in range(5)])
 
-    client = PayPalClient()
-    await client._get_access_token()
+    assert tokens == ["test-token"] * 5
+    assert paypal_api.count(TOKEN_PATH) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_transaction_requests_fetch_once(paypal, paypal_api):
+    """Concurrent identical chunk requests should share one upstream call."""
+
+    async def slow_transactions_response(request):
+        await asyncio.sleep(0.01)
+        return json_response({"transaction_details": [{"id": "TX1"}], "total_items": 1})
+
+    paypal_api.route(TRANSACTIONS_PATH, slow_transactions_response)
+
+    results = await asyncio.gather(*[
+        paypal.get_transactions("2024-01-01T00:00:00Z", "2024-01-15T00:00:00Z")
+        for _ in range(3)
+    ])
+
+    assert paypal_api.count(TRANSACTIONS_PATH) == 1
+    assert all(r["transaction_details"] == [{"id": "TX1"}] for r in results)
+    # Each caller gets its own copy to mutate
+    assert results[0] is not results[1]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_transaction_joiner_does_not_break_owner(paypal, paypal_api):
+    """Cancelling a caller joined to an in-flight chunk must not fail the owner."""
+    release = asyncio.Event()
+
+    async def held_response(request):
+        await release.wait()
+        return json_response({"transaction_details": [{"id": "TX1"}], "total_items": 1})
+
+    paypal_api.route(TRANSACTIONS_PATH, held_response)
+
+    args = ("2024-01-01T00:00:00Z", "2024-01-15T00:00:00Z")
+    owner = asyncio.create_task(paypal.get_transactions(*args))
+    await asyncio.sleep(0)
+    joiner = asyncio.create_task(paypal.get_transactions(*args))
+    await asyncio.sleep(0)
+
+    joiner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await joiner
+
+    release.set()
+    result = await owner
+    assert result["transaction_details"] == [{"id": "TX1"}]
+    assert paypal_api.count(TRANSACTIONS_PATH) == 1
+
+
+@pytest.mark.asyncio
+async def test_token_refresh_before_expiry(paypal, paypal_api):
+    """Token should be refreshed before actual expiry (60s buffer)."""
+    paypal_api.json(TOKEN_PATH, {"access_token": "new-token", "expires_in": 3600})
+
+    await paypal._get_access_token()
 
     # Manually expire the token
-    cache_key = client._get_cache_key()
-    client._token_cache[cache_key]["expires_at"] = 0
+    cache_key = paypal._get_cache_key()
+    paypal._token_cache[cache_key]["expires_at"] = 0
 
     # Should fetch new token
-    new_token = await client._get_access_token()
+    new_token = await paypal._get_access_token()
     assert new_token == "new-token"
-    assert mock_post.call_count == 2
-
-    await client.close()
+    assert paypal_api.count(TOKEN_PATH) == 2
 
 
 @pytest.mark.asyncio
-@patch("httpx.AsyncClient.post")
-@patch("httpx.AsyncClient.request")
-async def test_401_clears_cache_and_retries(mock_request, mock_post):
+async def test_401_clears_cache_and_retries(paypal, paypal_api):
     """401 response should clear token cache and retry once."""
-    from app.services.paypal_client import PayPalClient
-
-    # Mock successful token response
-    mock_post.return_value = AsyncMock(
-        json=lambda: {"access_token": "test-token", "expires_in": 3600},
-        raise_for_status=lambda: None,
-    )
-
     # First API call returns 401, second succeeds
-    mock_401_response = AsyncMock(status_code=401, json=lambda: {"error": "unauthorized"})
-    mock_401_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-        "Unauthorized",
-        request=AsyncMock(),
-        response=mock_401_response,
+    paypal_api.sequence(
+        BALANCES_PATH,
+        json_response({"error": "unauthorized"}, status_code=401),
+        json_response({"balances": []}),
     )
 
-    mock_success_response = AsyncMock(
-        json=lambda: {"balances": []},
-        raise_for_status=lambda: None,
-        status_code=200,
+    response = await paypal._request("GET", BALANCES_PATH)
+
+    assert "balances" in response
+    assert paypal_api.count(TOKEN_PATH) == 2  # Token refetched after 401
+
+
+@pytest.mark.asyncio
+async def test_concurrent_401s_refresh_token_once(paypal, paypal_api):
+    """Concurrent requests rejected with the same token should share one refresh."""
+    tokens = iter(["old-token", "new-token"])
+
+    async def token_response(request):
+        await asyncio.sleep(0.01)
+        return json_response({"access_token": next(tokens), "expires_in": 3600})
+
+    async def balances_response(request):
+        await asyncio.sleep(0.01)
+        if request.headers["authorization"] == "Bearer old-token":
+            return json_response({"error": "invalid_token"}, status_code=401)
+        return json_response({"balances": []})
+
+    paypal_api.route(TOKEN_PATH, token_response)
+    paypal_api.route(BALANCES_PATH, balances_response)
+
+    responses = await asyncio.gather(*[paypal._request("GET", BALANCES_PATH) for _ in range(5)])
+
+    assert responses == [{"balances": []}] * 5
+    assert paypal_api.count(TOKEN_PATH) == 2  # Initial token + one shared refresh
+
+
+@pytest.mark.asyncio
+@patch("app.services.paypal_client.asyncio.sleep", new_callable=AsyncMock)
+async def test_retryable_status_retried_with_retry_after(mock_sleep, paypal, paypal_api):
+    """429/5xx should be retried, honoring Retry-After; other 4xx should not."""
+    paypal_api.sequence(
+        BALANCES_PATH,
+        json_response(status_code=429, headers={"Retry-After": "2"}),
+        json_response(status_code=503),
+        json_response({"balances": []}),
     )
 
-    mock_request.side_effect = [
-        httpx.HTTPStatusError(
-            "Unauthorized",
-            request=AsyncMock(),
-            response=mock_401_response,
-        ),
-        mock_success_response,
-    ]
+    response = await paypal._request("GET", BALANCES_PATH)
 
-    client = PayPalClient()
-    response = await client._request("GET", "/v1/reporting/balances")
+    assert response == {"balances": []}
+    assert paypal_api.count(BALANCES_PATH) == 3
+    assert mock_sleep.await_args_list[0].args == (2.0,)
+
+    # Non-retryable client errors raise immediately
+    paypal_api.sequence(BALANCES_PATH, json_response({}, status_code=400))
+    with pytest.raises(httpx.HTTPStatusError):
+        await paypal._request("GET", BALANCES_PATH)
+    assert paypal_api.count(BALANCES_PATH) == 4
 
-    assert "balances" in response
-    await client.close()
+
+@pytest.mark.asyncio
+async def test_error_details_log_paypal_response(paypal, paypal_api, caplog):
+    """Every error-detail record for a failed call should carry the PayPal error body."""
+    paypal_api.json(
+        BALANCES_PATH, {"name": "INVALID_REQUEST", "debug_id": "dbg-1"}, status_code=400
+    )
+
+    with caplog.at_level("ERROR", logger="app.services.paypal_client"):
+        with pytest.raises(httpx.HTTPStatusError):
+            await paypal._request("GET", BALANCES_PATH)
+
+        paypal_api.json(
+            TOKEN_PATH, {"error": "server_error", "debug_id": "dbg-2"}, status_code=500
+        )
+        with pytest.raises(httpx.HTTPStatusError):
+            await paypal._fetch_access_token("sandbox")
+
+    details = {
+        record.error_details.data["error_type"]: record.error_details.data
+        for record in caplog.records
+        if hasattr(record, "error_details")
+    }
+    # Both the first report and the re-raise handler log the decoded body
+    for error_type, debug_id in [
+        ("PayPalAPIError", "dbg-1"),
+        ("HTTPStatusError", "dbg-1"),
+        ("TokenAuthenticationError", "dbg-2"),
+        ("TokenHTTPStatusError", "dbg-2"),
+    ]:
+        assert details[error_type]["paypal_debug_id"] == debug_id
 
 
 @pytest.mark.asyncio
-@patch("httpx.AsyncClient.post")
-async def test_get_balances_calls_correct_endpoint(mock_post):
+async def test_get_balances_calls_correct_endpoint(paypal, paypal_api):
     """get_balances should call PayPal balances endpoint."""
+    paypal_api.json(BALANCES_PATH, {"balances": []})
+
+    await paypal.get_balances()
+
+    # Verify correct endpoint was called
+    assert paypal_api.count(BALANCES_PATH) == 1
+    request = paypal_api.calls[-1]
+    assert request.method == "GET"
+    assert request.headers["authorization"] == "Bearer test-token"
+
+
+@pytest.mark.asyncio
+async def test_close_leaves_injected_client_open(paypal, paypal_http):
+    """close() should only close httpx clients the PayPalClient created itself."""
     from app.services.paypal_client import PayPalClient
 
-    # Mock token
-    mock_post.return_value = AsyncMock(
-        status_code=200,
-        json=lambda: {"access_token": "token", "expires_in": 3600},
-        raise_for_status=lambda: None,
-    )
+    await paypal.close()
+    assert not paypal_http.is_closed
 
-    # Mock balances request
-    with patch("httpx.AsyncClient.request") as mock_request:
-        mock_request.return_value = AsyncMock(
-            status_code=200,
-            json=lambda: {"balances": []},
-            raise_for_status=lambda: None,
-        )
+    owned = PayPalClient()
+    await owned.close()
+    assert owned._client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_admission_controller_limit_can_change():
+    """AdmissionController should cap concurrency and honor a raised limit."""
+    from app.services.paypal_client import AdmissionController
+
+    admit = AdmissionController(2)
+    active = 0
+    peak = 0
+
+    async def job():
+        nonlocal active, peak
+        async with admit:
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*[job() for _ in range(6)])
+    assert peak == 2
+
+    await admit.set_limit(4)
+    peak = 0
+    await asyncio.gather(*[job() for _ in range(6)])
+    assert peak == 4
+
+
+@pytest.mark.asyncio
+async def test_admission_controller_cancelled_waiter_does_not_strand_others():
+    """A woken waiter cancelled before it runs must not leave other waiters blocked."""
+    from app.services.paypal_client import AdmissionController
+
+    admit = AdmissionController(1)
+    await admit.acquire()
 
-        client = PayPalClient()
-        await client.get_balances()
+    b = asyncio.create_task(admit.acquire())
+    c = asyncio.create_task(admit.acquire())
+    await asyncio.sleep(0)
 
-        # Verify correct endpoint was called
-        mock_request.assert_called_once()
-        call_args = mock_request.call_args
-        assert "balances" in call_args[1]["url"]
+    # Release wakes B, which is cancelled before it can take the slot
+    admit.release()
+    b.cancel()
 
-        await client.close()
+    await asyncio.wait_for(c, timeout=1)
+    assert b.cancelled()
+    admit.release()
@@ -1,79 +1,85 @@
 """Test static file serving routes."""
 
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
 
-client = TestClient(app)
 
-
-def test_serve_index():
+@pytest.mark.asyncio
+async def test_serve_index(async_client):
     """Test homepage serves correctly."""
-    response = client.get("/")
+    response = await async_client.get("/")
     assert response.status_code == 200
     assert response.headers["content-type"] == "text/html; charset=utf-8"
     assert b"Portfolio" in response.content
 
 
-def test_serve_index_html():
+@pytest.mark.asyncio
+async def test_serve_index_html(async_client):
     """Test homepage at /index.html serves correctly."""
-    response = client.get("/index.html")
+    response = await async_client.get("/index.html")
     assert response.status_code == 200
     assert response.headers["content-type"] == "text/html; charset=utf-8"
     assert b"Portfolio" in response.content
 
 
-def test_serve_journey():
+@pytest.mark.asyncio
+async def test_serve_journey(async_client):
     """Test journey page serves correctly."""
-    response = client.get("/journey.html")
+    response = await async_client.get("/journey.html")
     assert response.status_code == 200
     assert response.headers["content-type"] == "text/html; charset=utf-8"
 
 
-def test_serve_finance():
+@pytest.mark.asyncio
+async def test_serve_finance(async_client):
     """Test finance page serves correctly."""
-    response = client.get("/finance.html")
+    response = await async_client.get("/finance.html")
     assert response.status_code == 200
     assert response.headers["content-type"] == "text/html; charset=utf-8"
     assert b"Finance Overview" in response.content
 
 
-def test_static_js_file():
+@pytest.mark.asyncio
+async def test_static_js_file(async_client):
     """Test JavaScript file accessible."""
-    response = client.get("/assets/js/app.js")
+    response = await async_client.get("/assets/js/app.js")
     assert response.status_code == 200
     assert "javascript" in response.headers["content-type"].lower()
 
 
-def test_static_finance_js():
+@pytest.mark.asyncio
+async def test_static_finance_js(async_client):
     """Test finance.js accessible."""
-    response = client.get("/assets/js/finance.js")
+    response = await async_client.get("/assets/js/finance.js")
     assert response.status_code == 200
     assert "javascript" in response.headers["content-type"].lower()
 
 
-def test_static_image():
+@pytest.mark.asyncio
+async def test_static_image(async_client):
     """Test image file accessible."""
-    response = client.get("/assets/images/sonbip.png")
+    response = await async_client.get("/assets/images/sonbip.png")
     assert response.status_code == 200
     assert "image/png" in response.headers["content-type"]
 
 
-def test_static_json_data():
+@pytest.mark.asyncio
+async def test_static_json_data(async_client):
     """Test JSON data file accessible."""
-    response = client.get("/data/journey.json")
+    response = await async_client.get("/data/journey.json")
     assert response.status_code == 200
     assert "application/json" in response.headers["content-type"]
 
 
-def test_404_for_missing_file():
+@pytest.mark.asyncio
+async def test_404_for_missing_file(async_client):
     """Test 404 returned for non-existent static file."""
-    response = client.get("/nonexistent.html")
+    response = await async_client.get("/nonexistent.html")
     assert response.status_code == 404
 
 
-def test_health_endpoint_still_works():
+@pytest.mark.asyncio
+async def test_health_endpoint_still_works(async_client):
     """Ensure existing /health endpoint still works."""
-    response = client.get("/health")
+    response = await async_client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}